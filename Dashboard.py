@@ -2,207 +2,2120 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly import subplots as plotly_subplots
 import warnings
+import ast
+import copy
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+import types
+import zlib
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Analyse Budget Français & LOLF",
-    page_icon="🇫🇷",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .metric-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #1f77b4;
-    }
-    .section-header {
-        color: #1f77b4;
-        border-bottom: 2px solid #1f77b4;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
+
+def _lazy_module(name):
+    """Module chargé au premier accès à l'un de ses attributs
+    
+    Réservé à plotly.express, seul module graphique que `import streamlit`
+    ne charge pas déjà (plotly.graph_objects l'est, pyarrow vient avec
+    pandas et streamlit) : il n'est importé que par les vues qui l'utilisent.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+px = _lazy_module('plotly.express')
+
+# Copy-on-Write : les vues partagées entre sessions ne sont jamais modifiées en place
+# (toujours actif à partir de pandas 3)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+# Données historiques des budgets français (en milliards d'euros)
+BUDGET_DATA = {
+    '2002': {
+        'recettes': 249.8, 'dépenses': 270.1, 'déficit': -20.3, 'dette': 870.2,
+        'recettes_impôts': 198.5, 'recettes_tva': 125.3, 'dépenses_éducation': 72.5,
+        'dépenses_santé': 118.7, 'dépenses_défense': 32.8, 'pib': 1522.1
+    },
+    '2003': {
+        'recettes': 255.2, 'dépenses': 279.4, 'déficit': -24.2, 'dette': 918.6,
+        'recettes_impôts': 202.1, 'recettes_tva': 128.7, 'dépenses_éducation': 74.2,
+        'dépenses_santé': 124.3, 'dépenses_défense': 33.5, 'pib': 1560.8
+    },
+    '2004': {
+        'recettes': 263.7, 'dépenses': 285.9, 'déficit': -22.2, 'dette': 951.3,
+        'recettes_impôts': 209.8, 'recettes_tva': 133.2, 'dépenses_éducation': 76.8,
+        'dépenses_santé': 129.6, 'dépenses_défense': 34.1, 'pib': 1612.5
+    },
+    '2005': {
+        'recettes': 274.5, 'dépenses': 292.4, 'déficit': -17.9, 'dette': 976.4,
+        'recettes_impôts': 218.7, 'recettes_tva': 139.5, 'dépenses_éducation': 78.5,
+        'dépenses_santé': 133.8, 'dépenses_défense': 34.8, 'pib': 1660.2
+    },
+    '2006': {
+        'recettes': 287.3, 'dépenses': 299.7, 'déficit': -12.4, 'dette': 992.7,
+        'recettes_impôts': 229.4, 'recettes_tva': 146.8, 'dépenses_éducation': 80.3,
+        'dépenses_santé': 138.2, 'dépenses_défense': 35.4, 'pib': 1715.3
+    },
+    '2007': {
+        'recettes': 298.6, 'dépenses': 307.2, 'déficit': -8.6, 'dette': 1001.5,
+        'recettes_impôts': 238.9, 'recettes_tva': 153.2, 'dépenses_éducation': 82.7,
+        'dépenses_santé': 142.9, 'dépenses_défense': 36.1, 'pib': 1792.1
+    },
+    '2008': {
+        'recettes': 289.4, 'dépenses': 327.8, 'déficit': -38.4, 'dette': 1087.3,
+        'recettes_impôts': 230.2, 'recettes_tva': 147.6, 'dépenses_éducation': 84.5,
+        'dépenses_santé': 148.3, 'dépenses_défense': 36.8, 'pib': 1837.3
+    },
+    '2009': {
+        'recettes': 272.8, 'dépenses': 356.2, 'déficit': -83.4, 'dette': 1214.7,
+        'recettes_impôts': 215.3, 'recettes_tva': 135.4, 'dépenses_éducation': 86.2,
+        'dépenses_santé': 155.8, 'dépenses_défense': 37.5, 'pib': 1782.4
+    },
+    '2010': {
+        'recettes': 282.5, 'dépenses': 364.8, 'déficit': -82.3, 'dette': 1294.2,
+        'recettes_impôts': 223.7, 'recettes_tva': 142.8, 'dépenses_éducation': 87.9,
+        'dépenses_santé': 162.4, 'dépenses_défense': 38.2, 'pib': 1835.7
+    },
+    '2011': {
+        'recettes': 295.7, 'dépenses': 373.2, 'déficit': -77.5, 'dette': 1367.4,
+        'recettes_impôts': 234.6, 'recettes_tva': 151.3, 'dépenses_éducation': 89.6,
+        'dépenses_santé': 168.9, 'dépenses_défense': 38.9, 'pib': 1883.2
+    },
+    '2012': {
+        'recettes': 302.4, 'dépenses': 379.6, 'déficit': -77.2, 'dette': 1438.5,
+        'recettes_impôts': 240.1, 'recettes_tva': 155.7, 'dépenses_éducation': 91.3,
+        'dépenses_santé': 175.4, 'dépenses_défense': 39.6, 'pib': 1912.8
+    },
+    '2013': {
+        'recettes': 309.8, 'dépenses': 385.2, 'déficit': -75.4, 'dette': 1498.7,
+        'recettes_impôts': 246.3, 'recettes_tva': 160.2, 'dépenses_éducation': 93.0,
+        'dépenses_santé': 181.9, 'dépenses_défense': 40.3, 'pib': 1943.9
+    },
+    '2014': {
+        'recettes': 317.5, 'dépenses': 390.7, 'déficit': -73.2, 'dette': 1552.8,
+        'recettes_impôts': 252.8, 'recettes_tva': 165.1, 'dépenses_éducation': 94.7,
+        'dépenses_santé': 188.4, 'dépenses_défense': 41.0, 'pib': 1978.3
+    },
+    '2015': {
+        'recettes': 325.6, 'dépenses': 395.9, 'déficit': -70.3, 'dette': 1600.2,
+        'recettes_impôts': 259.7, 'recettes_tva': 170.3, 'dépenses_éducation': 96.4,
+        'dépenses_santé': 194.9, 'dépenses_défense': 41.7, 'pib': 2015.8
+    },
+    '2016': {
+        'recettes': 334.1, 'dépenses': 400.8, 'déficit': -66.7, 'dette': 1640.9,
+        'recettes_impôts': 267.0, 'recettes_tva': 175.8, 'dépenses_éducation': 98.1,
+        'dépenses_santé': 201.4, 'dépenses_défense': 42.4, 'pib': 2055.7
+    },
+    '2017': {
+        'recettes': 343.0, 'dépenses': 405.4, 'déficit': -62.4, 'dette': 1675.2,
+        'recettes_impôts': 274.7, 'recettes_tva': 181.6, 'dépenses_éducation': 99.8,
+        'dépenses_santé': 207.9, 'dépenses_défense': 43.1, 'pib': 2100.3
+    },
+    '2018': {
+        'recettes': 352.3, 'dépenses': 409.7, 'déficit': -57.4, 'dette': 1703.4,
+        'recettes_impôts': 282.9, 'recettes_tva': 187.7, 'dépenses_éducation': 101.5,
+        'dépenses_santé': 214.4, 'dépenses_défense': 43.8, 'pib': 2150.1
+    },
+    '2019': {
+        'recettes': 362.1, 'dépenses': 413.7, 'déficit': -51.6, 'dette': 1725.8,
+        'recettes_impôts': 291.5, 'recettes_tva': 194.1, 'dépenses_éducation': 103.2,
+        'dépenses_santé': 220.9, 'dépenses_défense': 44.5, 'pib': 2205.2
+    },
+    '2020': {
+        'recettes': 342.8, 'dépenses': 478.3, 'déficit': -135.5, 'dette': 1950.4,
+        'recettes_impôts': 274.2, 'recettes_tva': 175.9, 'dépenses_éducation': 105.9,
+        'dépenses_santé': 245.8, 'dépenses_défense': 45.2, 'pib': 2100.5
+    },
+    '2021': {
+        'recettes': 368.5, 'dépenses': 460.2, 'déficit': -91.7, 'dette': 2020.8,
+        'recettes_impôts': 294.8, 'recettes_tva': 195.3, 'dépenses_éducation': 108.6,
+        'dépenses_santé': 240.2, 'dépenses_défense': 45.9, 'pib': 2250.7
+    },
+    '2022': {
+        'recettes': 395.2, 'dépenses': 442.1, 'déficit': -46.9, 'dette': 2050.2,
+        'recettes_impôts': 316.2, 'recettes_tva': 215.7, 'dépenses_éducation': 111.3,
+        'dépenses_santé': 234.6, 'dépenses_défense': 46.6, 'pib': 2400.9
+    },
+    '2023': {
+        'recettes': 422.9, 'dépenses': 424.0, 'déficit': -1.1, 'dette': 2055.3,
+        'recettes_impôts': 338.3, 'recettes_tva': 237.1, 'dépenses_éducation': 114.0,
+        'dépenses_santé': 229.0, 'dépenses_défense': 47.3, 'pib': 2551.1
+    },
+    '2024': {
+        'recettes': 451.6, 'dépenses': 405.9, 'déficit': 45.7, 'dette': 2009.6,
+        'recettes_impôts': 361.3, 'recettes_tva': 259.5, 'dépenses_éducation': 116.7,
+        'dépenses_santé': 223.4, 'dépenses_défense': 48.0, 'pib': 2701.3
+    },
+    '2025': {
+        'recettes': 481.3, 'dépenses': 387.8, 'déficit': 93.5, 'dette': 1916.1,
+        'recettes_impôts': 385.0, 'recettes_tva': 282.9, 'dépenses_éducation': 119.4,
+        'dépenses_santé': 217.8, 'dépenses_défense': 48.7, 'pib': 2851.5
     }
-</style>
-""", unsafe_allow_html=True)
+}
 
-class BudgetDashboard:
-    def __init__(self):
-        self.df = self.load_data()
-        
-    def load_data(self):
-        """Charge les données budgétaires"""
-        # Données historiques des budgets français (en milliards d'euros)
-        budget_data = {
-            '2002': {
-                'recettes': 249.8, 'dépenses': 270.1, 'déficit': -20.3, 'dette': 870.2,
-                'recettes_impôts': 198.5, 'recettes_tva': 125.3, 'dépenses_éducation': 72.5,
-                'dépenses_santé': 118.7, 'dépenses_défense': 32.8, 'pib': 1522.1
-            },
-            '2003': {
-                'recettes': 255.2, 'dépenses': 279.4, 'déficit': -24.2, 'dette': 918.6,
-                'recettes_impôts': 202.1, 'recettes_tva': 128.7, 'dépenses_éducation': 74.2,
-                'dépenses_santé': 124.3, 'dépenses_défense': 33.5, 'pib': 1560.8
-            },
-            '2004': {
-                'recettes': 263.7, 'dépenses': 285.9, 'déficit': -22.2, 'dette': 951.3,
-                'recettes_impôts': 209.8, 'recettes_tva': 133.2, 'dépenses_éducation': 76.8,
-                'dépenses_santé': 129.6, 'dépenses_défense': 34.1, 'pib': 1612.5
-            },
-            '2005': {
-                'recettes': 274.5, 'dépenses': 292.4, 'déficit': -17.9, 'dette': 976.4,
-                'recettes_impôts': 218.7, 'recettes_tva': 139.5, 'dépenses_éducation': 78.5,
-                'dépenses_santé': 133.8, 'dépenses_défense': 34.8, 'pib': 1660.2
-            },
-            '2006': {
-                'recettes': 287.3, 'dépenses': 299.7, 'déficit': -12.4, 'dette': 992.7,
-                'recettes_impôts': 229.4, 'recettes_tva': 146.8, 'dépenses_éducation': 80.3,
-                'dépenses_santé': 138.2, 'dépenses_défense': 35.4, 'pib': 1715.3
-            },
-            '2007': {
-                'recettes': 298.6, 'dépenses': 307.2, 'déficit': -8.6, 'dette': 1001.5,
-                'recettes_impôts': 238.9, 'recettes_tva': 153.2, 'dépenses_éducation': 82.7,
-                'dépenses_santé': 142.9, 'dépenses_défense': 36.1, 'pib': 1792.1
-            },
-            '2008': {
-                'recettes': 289.4, 'dépenses': 327.8, 'déficit': -38.4, 'dette': 1087.3,
-                'recettes_impôts': 230.2, 'recettes_tva': 147.6, 'dépenses_éducation': 84.5,
-                'dépenses_santé': 148.3, 'dépenses_défense': 36.8, 'pib': 1837.3
-            },
-            '2009': {
-                'recettes': 272.8, 'dépenses': 356.2, 'déficit': -83.4, 'dette': 1214.7,
-                'recettes_impôts': 215.3, 'recettes_tva': 135.4, 'dépenses_éducation': 86.2,
-                'dépenses_santé': 155.8, 'dépenses_défense': 37.5, 'pib': 1782.4
-            },
-            '2010': {
-                'recettes': 282.5, 'dépenses': 364.8, 'déficit': -82.3, 'dette': 1294.2,
-                'recettes_impôts': 223.7, 'recettes_tva': 142.8, 'dépenses_éducation': 87.9,
-                'dépenses_santé': 162.4, 'dépenses_défense': 38.2, 'pib': 1835.7
-            },
-            '2011': {
-                'recettes': 295.7, 'dépenses': 373.2, 'déficit': -77.5, 'dette': 1367.4,
-                'recettes_impôts': 234.6, 'recettes_tva': 151.3, 'dépenses_éducation': 89.6,
-                'dépenses_santé': 168.9, 'dépenses_défense': 38.9, 'pib': 1883.2
-            },
-            '2012': {
-                'recettes': 302.4, 'dépenses': 379.6, 'déficit': -77.2, 'dette': 1438.5,
-                'recettes_impôts': 240.1, 'recettes_tva': 155.7, 'dépenses_éducation': 91.3,
-                'dépenses_santé': 175.4, 'dépenses_défense': 39.6, 'pib': 1912.8
-            },
-            '2013': {
-                'recettes': 309.8, 'dépenses': 385.2, 'déficit': -75.4, 'dette': 1498.7,
-                'recettes_impôts': 246.3, 'recettes_tva': 160.2, 'dépenses_éducation': 93.0,
-                'dépenses_santé': 181.9, 'dépenses_défense': 40.3, 'pib': 1943.9
-            },
-            '2014': {
-                'recettes': 317.5, 'dépenses': 390.7, 'déficit': -73.2, 'dette': 1552.8,
-                'recettes_impôts': 252.8, 'recettes_tva': 165.1, 'dépenses_éducation': 94.7,
-                'dépenses_santé': 188.4, 'dépenses_défense': 41.0, 'pib': 1978.3
-            },
-            '2015': {
-                'recettes': 325.6, 'dépenses': 395.9, 'déficit': -70.3, 'dette': 1600.2,
-                'recettes_impôts': 259.7, 'recettes_tva': 170.3, 'dépenses_éducation': 96.4,
-                'dépenses_santé': 194.9, 'dépenses_défense': 41.7, 'pib': 2015.8
-            },
-            '2016': {
-                'recettes': 334.1, 'dépenses': 400.8, 'déficit': -66.7, 'dette': 1640.9,
-                'recettes_impôts': 267.0, 'recettes_tva': 175.8, 'dépenses_éducation': 98.1,
-                'dépenses_santé': 201.4, 'dépenses_défense': 42.4, 'pib': 2055.7
-            },
-            '2017': {
-                'recettes': 343.0, 'dépenses': 405.4, 'déficit': -62.4, 'dette': 1675.2,
-                'recettes_impôts': 274.7, 'recettes_tva': 181.6, 'dépenses_éducation': 99.8,
-                'dépenses_santé': 207.9, 'dépenses_défense': 43.1, 'pib': 2100.3
-            },
-            '2018': {
-                'recettes': 352.3, 'dépenses': 409.7, 'déficit': -57.4, 'dette': 1703.4,
-                'recettes_impôts': 282.9, 'recettes_tva': 187.7, 'dépenses_éducation': 101.5,
-                'dépenses_santé': 214.4, 'dépenses_défense': 43.8, 'pib': 2150.1
-            },
-            '2019': {
-                'recettes': 362.1, 'dépenses': 413.7, 'déficit': -51.6, 'dette': 1725.8,
-                'recettes_impôts': 291.5, 'recettes_tva': 194.1, 'dépenses_éducation': 103.2,
-                'dépenses_santé': 220.9, 'dépenses_défense': 44.5, 'pib': 2205.2
-            },
-            '2020': {
-                'recettes': 342.8, 'dépenses': 478.3, 'déficit': -135.5, 'dette': 1950.4,
-                'recettes_impôts': 274.2, 'recettes_tva': 175.9, 'dépenses_éducation': 105.9,
-                'dépenses_santé': 245.8, 'dépenses_défense': 45.2, 'pib': 2100.5
-            },
-            '2021': {
-                'recettes': 368.5, 'dépenses': 460.2, 'déficit': -91.7, 'dette': 2020.8,
-                'recettes_impôts': 294.8, 'recettes_tva': 195.3, 'dépenses_éducation': 108.6,
-                'dépenses_santé': 240.2, 'dépenses_défense': 45.9, 'pib': 2250.7
-            },
-            '2022': {
-                'recettes': 395.2, 'dépenses': 442.1, 'déficit': -46.9, 'dette': 2050.2,
-                'recettes_impôts': 316.2, 'recettes_tva': 215.7, 'dépenses_éducation': 111.3,
-                'dépenses_santé': 234.6, 'dépenses_défense': 46.6, 'pib': 2400.9
-            },
-            '2023': {
-                'recettes': 422.9, 'dépenses': 424.0, 'déficit': -1.1, 'dette': 2055.3,
-                'recettes_impôts': 338.3, 'recettes_tva': 237.1, 'dépenses_éducation': 114.0,
-                'dépenses_santé': 229.0, 'dépenses_défense': 47.3, 'pib': 2551.1
-            },
-            '2024': {
-                'recettes': 451.6, 'dépenses': 405.9, 'déficit': 45.7, 'dette': 2009.6,
-                'recettes_impôts': 361.3, 'recettes_tva': 259.5, 'dépenses_éducation': 116.7,
-                'dépenses_santé': 223.4, 'dépenses_défense': 48.0, 'pib': 2701.3
-            },
-            '2025': {
-                'recettes': 481.3, 'dépenses': 387.8, 'déficit': 93.5, 'dette': 1916.1,
-                'recettes_impôts': 385.0, 'recettes_tva': 282.9, 'dépenses_éducation': 119.4,
-                'dépenses_santé': 217.8, 'dépenses_défense': 48.7, 'pib': 2851.5
-            }
-        }
-        
-        # Conversion en DataFrame
+
+def compute_data_version(budget_data):
+    """Calcule une empreinte du contenu des données (clé d'invalidation des caches)"""
+    payload = json.dumps(budget_data, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+# Colonnes de stock ou macro-économiques : non additives entre lignes d'une même année
+NON_ADDITIVE_COLUMNS = ('dette', 'pib')
+
+# Niveaux de la nomenclature LOLF, du plus agrégé au plus fin
+LOLF_LEVELS = ('mission', 'programme', 'action', 'sous_action')
+
+# Écart maximal toléré (en unités de la colonne : Md€, points de %) pour stocker une colonne en float32
+FLOAT32_TOLERANCE = 1e-3
+
+
+def _require_pyarrow():
+    """Importe pyarrow à la demande (dépendance optionnelle des formats colonnaires)"""
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow est requis pour les fichiers Parquet/Arrow : pip install pyarrow"
+        ) from exc
+    return pyarrow
+
+
+def aggregate_to_year(df):
+    """Ramène un fichier détaillé (mission, programme, action...) au grain annuel
+    
+    Les sommes sont calculées en float64 / int64, quels que soient les types
+    du fichier : les types compacts ne s'appliquent qu'au résultat.
+    """
+    if not df['year'].duplicated().any():
+        return df.sort_values('year').reset_index(drop=True)
+    
+    value_columns = [c for c in df.columns
+                     if c != 'year' and pd.api.types.is_numeric_dtype(df[c])]
+    aggregations = {c: 'first' if c in NON_ADDITIVE_COLUMNS else 'sum' for c in value_columns}
+    df = widen_budget_schema(df[['year', *value_columns]])
+    return df.groupby('year', sort=True).agg(aggregations).reset_index()
+
+
+def apply_budget_schema(df, float_tolerance=FLOAT32_TOLERANCE):
+    """Types compacts : année int16, libellés LOLF catégoriels, float32 quand la précision le permet
+    
+    Une colonne flottante passe en float32 si aucune valeur ne s'écarte de
+    plus de `float_tolerance` après conversion (montants en Md€, taux en %) ;
+    des montants en euros gardent leur float64. Les libellés répétés
+    (mission, programme...) sont encodés par dictionnaire. Retourne un
+    nouveau DataFrame.
+    """
+    dtypes = {}
+    for column in df.columns:
+        series = df[column]
+        if column == 'year':
+            if pd.api.types.is_integer_dtype(series) and series.between(-2 ** 15, 2 ** 15 - 1).all():
+                dtypes[column] = np.int16
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+            values = series.to_numpy(dtype=np.float64)
+            with np.errstate(over='ignore', invalid='ignore'):
+                error = np.abs(values - values.astype(np.float32))
+            if not len(values) or np.all(np.isnan(values) | (error <= float_tolerance)):
+                dtypes[column] = np.float32
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            dtypes[column] = pd.to_numeric(series, downcast='integer').dtype
+        elif series.dtype == object or pd.api.types.is_string_dtype(series):
+            if column in LOLF_LEVELS or series.nunique(dropna=False) <= len(series) // 2:
+                dtypes[column] = 'category'
+    return df.astype(dtypes) if dtypes else df
+
+
+def widen_budget_schema(df):
+    """Inverse d'apply_budget_schema pour les colonnes numériques (calculs en float64 / int64)"""
+    return df.astype({c: np.float64 if pd.api.types.is_float_dtype(df[c]) else np.int64
+                      for c in df.columns
+                      if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])
+                      and df[c].dtype.itemsize < 8})
+
+
+def schema_report(df):
+    """Mémoire de chaque colonne avec les types compacts et avec les types par défaut
+    
+    Les types par défaut sont ceux d'un DataFrame construit sans schéma :
+    float64, int64 et chaînes Python (object). Une ligne « total » termine
+    la table.
+    """
+    rows = []
+    for column in df.columns:
+        series = df[column]
+        compact = series.memory_usage(index=False, deep=True)
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            default = series.astype(object).memory_usage(index=False, deep=True)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            default = 8 * len(series)
+        else:
+            default = compact
+        rows.append((column, str(series.dtype), compact, default))
+    report = pd.DataFrame(rows, columns=['colonne', 'type', 'octets', 'octets_par_défaut'])
+    report.loc[len(report)] = ('total', '', report['octets'].sum(), report['octets_par_défaut'].sum())
+    report['gain_%'] = (1 - report['octets'] / report['octets_par_défaut'].where(report['octets_par_défaut'] > 0)) * 100
+    return report
+
+
+class BudgetSource:
+    """Source de données budgétaires
+    
+    Une source fournit une empreinte peu coûteuse (clé de version) et sait
+    lire un sous-ensemble de colonnes, toujours accompagné de la colonne `year`.
+    Quel que soit le format, les colonnes demandées absentes de la source
+    sont ignorées (les indicateurs qui en dépendent ne sont pas calculés).
+    """
+    
+    def fingerprint(self):
+        raise NotImplementedError
+    
+    def read(self, columns=None):
+        raise NotImplementedError
+    
+    @staticmethod
+    def _with_year(columns):
+        if columns is None:
+            return None
+        return ['year'] + [c for c in columns if c != 'year']
+
+
+class InlineSource(BudgetSource):
+    """Données historiques intégrées au code (BUDGET_DATA)"""
+    
+    def __init__(self, budget_data):
+        self.budget_data = budget_data
+    
+    def fingerprint(self):
+        return compute_data_version(self.budget_data)
+    
+    def read(self, columns=None):
         all_data = []
-        for year_str, data in budget_data.items():
+        for year_str, data in self.budget_data.items():
             row = data.copy()
             row['year'] = int(year_str)
             all_data.append(row)
         
         df = pd.DataFrame(all_data)
+        columns = self._with_year(columns)
+        return df if columns is None else df[[c for c in columns if c in df.columns]]
+
+
+class FileSource(BudgetSource):
+    """Source fichier : la version dépend du chemin, de la taille et de la date de modification"""
+    
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+    
+    def fingerprint(self):
+        stat = os.stat(self.path)
+        payload = f"{self.path}:{stat.st_size}:{stat.st_mtime_ns}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ParquetSource(FileSource):
+    """Fichier Parquet, lu en mémoire mappée colonne par colonne"""
+    
+    def read(self, columns=None):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
         
-        # Calcul des indicateurs
-        df['déficit_pib_%'] = df['déficit'] / df['pib'] * 100
-        df['dette_pib_%'] = df['dette'] / df['pib'] * 100
-        df['recettes_pib_%'] = df['recettes'] / df['pib'] * 100
-        df['dépenses_pib_%'] = df['dépenses'] / df['pib'] * 100
-        df['recettes_tva_%'] = df['recettes_tva'] / df['recettes'] * 100
-        df['dépenses_éducation_%'] = df['dépenses_éducation'] / df['dépenses'] * 100
-        df['dépenses_santé_%'] = df['dépenses_santé'] / df['dépenses'] * 100
-        df['dépenses_défense_%'] = df['dépenses_défense'] / df['dépenses'] * 100
-        
-        # Ajout des indicateurs LOLF simulés
-        np.random.seed(42)
-        df['taux_execution_recettes'] = np.random.uniform(95, 102, len(df))
-        df['taux_execution_dépenses'] = np.random.uniform(98, 101, len(df))
-        df['score_gestion_lolf'] = (
-            (df['taux_execution_recettes'] - 95) / 5 * 25 +
-            (df['taux_execution_dépenses'] - 98) / 2 * 25 +
-            (100 - abs(df['déficit_pib_%'])) / 10 * 50
-        )
+        columns = self._with_year(columns)
+        if columns is not None:
+            present = set(pq.read_schema(self.path).names)
+            columns = [c for c in columns if c in present]
+        table = pq.read_table(self.path, columns=columns, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+
+class ArrowSource(FileSource):
+    """Fichier Arrow IPC (Feather v2) mappé en mémoire : seules les colonnes lues sont chargées
+    
+    Un jeu déjà préparé (write_prepared_dataset) porte sa version dans les
+    métadonnées du fichier ; elle est reportée dans `attrs` du DataFrame lu.
+    """
+    
+    def read(self, columns=None):
+        pa = _require_pyarrow()
         
+        table = pa.ipc.open_file(pa.memory_map(self.path, 'r')).read_all()
+        columns = self._with_year(columns)
+        if columns is not None:
+            table = table.select([c for c in columns if c in table.column_names])
+        df = table.to_pandas(split_blocks=True)
+        prepared = (table.schema.metadata or {}).get(PREPARED_VERSION_KEY.encode('utf-8'))
+        if prepared:
+            df.attrs[PREPARED_VERSION_KEY] = prepared.decode('utf-8')
         return df
 
+
+class CsvSource(FileSource):
+    """Fichier CSV (compatibilité avec les exports existants)"""
+    
+    def read(self, columns=None):
+        columns = self._with_year(columns)
+        usecols = None if columns is None else (lambda c: c in columns)
+        return pd.read_csv(self.path, usecols=usecols)
+
+
+class DirectorySource(BudgetSource):
+    """Répertoire de fichiers budgétaires (un par année, par exemple)
+    
+    Chaque fichier contient des lignes distinctes ; une révision remplace le
+    fichier concerné. L'empreinte couvre la liste des fichiers, leur taille et
+    leur date de modification : un ajout ou une révision change la version.
+    """
+    
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+    
+    def files(self):
+        """{chemin: (taille, date de modification)} des fichiers de format supporté"""
+        stats = {}
+        for entry in sorted(os.scandir(self.path), key=lambda e: e.name):
+            extension = os.path.splitext(entry.name)[1].lower()
+            if entry.is_file() and not entry.name.startswith('.') and extension in SOURCE_FORMATS:
+                stat = entry.stat()
+                stats[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return stats
+    
+    def fingerprint(self):
+        payload = json.dumps(sorted(self.files().items()))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def read_file(self, path, columns=None):
+        return source_from_path(path).read(columns)
+    
+    def read(self, columns=None):
+        frames = [self.read_file(path, columns) for path in self.files()]
+        if not frames:
+            raise ValueError(f"Aucun fichier de données dans {self.path}")
+        return pd.concat(frames, ignore_index=True)
+
+
+SOURCE_FORMATS = {
+    '.parquet': ParquetSource,
+    '.pq': ParquetSource,
+    '.arrow': ArrowSource,
+    '.feather': ArrowSource,
+    '.ipc': ArrowSource,
+    '.csv': CsvSource,
+}
+
+
+def source_from_path(path):
+    """Choisit l'implémentation de source d'après l'extension du fichier (ou un répertoire)"""
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SOURCE_FORMATS:
+        raise ValueError(f"Format de données non supporté : {path} "
+                         f"(attendu : {', '.join(sorted(SOURCE_FORMATS))})")
+    return SOURCE_FORMATS[extension](path)
+
+
+def default_source():
+    """Source configurée par la variable BUDGET_DATA_PATH, sinon les données intégrées"""
+    path = os.environ.get('BUDGET_DATA_PATH')
+    return source_from_path(path) if path else InlineSource(BUDGET_DATA)
+
+
+# Métadonnée des fichiers Arrow contenant un jeu déjà préparé : sa version
+PREPARED_VERSION_KEY = 'budget_dataset_version'
+
+
+def write_columnar(df, path):
+    """Écrit un DataFrame au format colonnaire (Parquet ou Arrow IPC selon l'extension)"""
+    pa = _require_pyarrow()
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if isinstance(source_from_path(path), ParquetSource):
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+
+def write_prepared_dataset(dataset, path):
+    """Écrit un jeu préparé (taux et indicateurs calculés) en Arrow IPC, avec sa version
+    
+    Lu comme source (BUDGET_DATA_PATH), il est servi tel quel : ni
+    agrégation, ni simulation des taux, ni calcul des indicateurs.
+    """
+    pa = _require_pyarrow()
+    
+    table = pa.Table.from_pandas(dataset.view(), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           PREPARED_VERSION_KEY: dataset.version})
+    with pa.OSFile(path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def convert_csv_to_columnar(csv_path, dest_path):
+    """Importe un export CSV et le convertit au format colonnaire"""
+    write_columnar(CsvSource(csv_path).read(), dest_path)
+
+
+# Indicateur dérivé : colonnes d'entrée et formule vectorisée sur des tableaux NumPy
+DerivedIndicator = namedtuple('DerivedIndicator', ['dependencies', 'formula'])
+
+
+def _share(numerator, denominator):
+    """Indicateur exprimé en pourcentage d'une autre colonne"""
+    return DerivedIndicator(
+        (numerator, denominator),
+        lambda c: c[numerator] / c[denominator] * 100
+    )
+
+
+# Registre déclaratif des indicateurs dérivés, dans un ordre compatible avec leurs dépendances
+DERIVED_INDICATORS = {
+    'déficit_pib_%': _share('déficit', 'pib'),
+    'dette_pib_%': _share('dette', 'pib'),
+    'recettes_pib_%': _share('recettes', 'pib'),
+    'dépenses_pib_%': _share('dépenses', 'pib'),
+    'recettes_tva_%': _share('recettes_tva', 'recettes'),
+    'dépenses_éducation_%': _share('dépenses_éducation', 'dépenses'),
+    'dépenses_santé_%': _share('dépenses_santé', 'dépenses'),
+    'dépenses_défense_%': _share('dépenses_défense', 'dépenses'),
+    'éducation_pib_%': _share('dépenses_éducation', 'pib'),
+    'santé_pib_%': _share('dépenses_santé', 'pib'),
+    'défense_pib_%': _share('dépenses_défense', 'pib'),
+    'score_gestion_lolf': DerivedIndicator(
+        ('taux_execution_recettes', 'taux_execution_dépenses', 'déficit_pib_%'),
+        lambda c: (
+            (c['taux_execution_recettes'] - 95) / 5 * 25 +
+            (c['taux_execution_dépenses'] - 98) / 2 * 25 +
+            (100 - np.abs(c['déficit_pib_%'])) / 10 * 50
+        )
+    ),
+}
+
+
+def affected_indicators(changed_columns):
+    """Indicateurs à recalculer quand les colonnes données changent (dépendances transitives)"""
+    changed = set(changed_columns)
+    affected = []
+    for name, indicator in DERIVED_INDICATORS.items():
+        if changed.intersection(indicator.dependencies):
+            affected.append(name)
+            changed.add(name)
+    return affected
+
+
+def compute_indicators(df, names=None):
+    """Calcule des indicateurs dérivés en une passe vectorisée
+    
+    Les colonnes d'entrée sont extraites une seule fois en tableaux NumPy ;
+    les indicateurs dont une entrée manque sont ignorés. Retourne un
+    dictionnaire {nom: tableau} sans modifier `df`.
+    """
+    names = list(DERIVED_INDICATORS) if names is None else names
+    arrays = {}
+    results = {}
+    for name in DERIVED_INDICATORS:
+        if name not in names:
+            continue
+        indicator = DERIVED_INDICATORS[name]
+        for dependency in indicator.dependencies:
+            if dependency not in arrays and dependency in df.columns:
+                arrays[dependency] = df[dependency].to_numpy(dtype=np.float64)
+        if all(dependency in arrays for dependency in indicator.dependencies):
+            arrays[name] = results[name] = indicator.formula(arrays)
+    return results
+
+
+def refresh_indicators(df, changed_columns):
+    """Recalcule uniquement les indicateurs dépendant des colonnes modifiées"""
+    return df.assign(**compute_indicators(df, affected_indicators(changed_columns)))
+
+
+def append_indicator_rows(df, new_rows):
+    """Ajoute de nouvelles lignes (années, révisions) en ne calculant leurs indicateurs que sur elles"""
+    new_rows = new_rows.assign(**compute_indicators(new_rows))
+    return pd.concat([df, new_rows], ignore_index=True)
+
+
+# Taux d'exécution LOLF simulés (%) : bornes (min, max) du tirage uniforme annuel
+EXECUTION_RATE_RANGES = {
+    'taux_execution_recettes': (95, 102),
+    'taux_execution_dépenses': (98, 101),
+}
+
+
+class ExecutionRateModel:
+    """Modèle des taux d'exécution LOLF simulés, déterministe année par année
+    
+    Chaque année tire dans son propre générateur
+    (SeedSequence(seed, spawn_key=(année,))) : le taux d'une année ne dépend
+    ni de l'état global de numpy, ni de l'ordre des appels, ni des autres
+    années présentes. Ajouter 2026 ne modifie pas 2002-2025, et un ajout
+    incrémental donne le même résultat qu'une reconstruction complète.
+    
+    `VERSION` est à incrémenter à chaque changement du tirage : avec la graine
+    et les plages, il entre dans la version des données préparées.
+    """
+    
+    # 2 : un générateur par année (1 : générateur global, taux dépendant des autres années)
+    VERSION = 2
+    
+    def __init__(self, seed=42, ranges=None):
+        self.seed = seed
+        self.ranges = dict(ranges or EXECUTION_RATE_RANGES)
+    
+    def fingerprint(self):
+        """Paramètres dont dépendent les taux tirés"""
+        return {'version': self.VERSION, 'seed': self.seed,
+                'ranges': {column: list(bounds) for column, bounds in self.ranges.items()}}
+    
+    def generator(self, year, *key):
+        """Générateur isolé d'une année (et d'une sous-clé éventuelle)"""
+        return np.random.default_rng(np.random.SeedSequence(self.seed, spawn_key=(int(year), *key)))
+    
+    def rates(self, years):
+        """{colonne: taux} pour chaque année de `years` (années répétées : mêmes taux)"""
+        unique_years, inverse = np.unique(np.asarray(years), return_inverse=True)
+        draws = np.empty((len(unique_years), len(self.ranges)))
+        for i, year in enumerate(unique_years):
+            draws[i] = self.generator(year).uniform(*zip(*self.ranges.values()))
+        return {column: draws[inverse, j] for j, column in enumerate(self.ranges)}
+    
+    def programme_frame(self, years, n_programmes, n_missions=32, dispersion=2.0, budget=None):
+        """Exécution synthétique au grain programme, pour les tests de charge
+        
+        Une ligne par année et par programme : crédits ouverts (répartition
+        de Dirichlet du budget annuel, `budget` étant {année: Md€}, 500 par
+        défaut), taux d'exécution (taux annuel du modèle ± `dispersion`
+        points) et crédits consommés. Les tirages sont vectorisés année par
+        année : plusieurs millions de lignes en quelques secondes.
+        """
+        years = np.asarray(sorted(set(years)))
+        low, high = self.ranges['taux_execution_dépenses']
+        yearly_rate = self.rates(years)['taux_execution_dépenses']
+        
+        opened = np.empty((len(years), n_programmes))
+        rate = np.empty((len(years), n_programmes))
+        for i, year in enumerate(years):
+            rng = self.generator(year, 1)
+            total = budget.get(int(year), 500.0) if budget else 500.0
+            opened[i] = rng.dirichlet(np.ones(n_programmes)) * total
+            rate[i] = np.clip(yearly_rate[i] + rng.normal(0, dispersion, n_programmes),
+                              low - 5 * dispersion, high + 5 * dispersion)
+        
+        programmes = np.tile(np.arange(n_programmes), len(years))
+        return pd.DataFrame({
+            'year': np.repeat(years, n_programmes),
+            'mission': pd.Categorical.from_codes(programmes % n_missions,
+                                                 [f"M{m:02d}" for m in range(n_missions)]),
+            'programme': pd.Categorical.from_codes(programmes,
+                                                   [f"P{p:06d}" for p in range(n_programmes)]),
+            'crédits_ouverts': opened.ravel(),
+            'taux_execution_dépenses': rate.ravel(),
+            'crédits_consommés': (opened * rate / 100).ravel(),
+        })
+
+
+EXECUTION_RATE_MODEL = ExecutionRateModel()
+
+
+def simulate_execution_rates(df):
+    """Ajoute les taux d'exécution LOLF simulés (absents des données sources)"""
+    return df.assign(**EXECUTION_RATE_MODEL.rates(df['year']))
+
+
+def prepare_budget_frame(df):
+    """Calcule les indicateurs dérivés disponibles à partir des colonnes chargées"""
+    df = simulate_execution_rates(aggregate_to_year(df))
+    
+    # Calcul des indicateurs (en float64), puis stockage en types compacts
+    return apply_budget_schema(df.assign(**compute_indicators(df)))
+
+
+# Version des résultats calculés (jeu préparé, figures, scénarios, tables) : à incrémenter
+# quand un calcul change sans que l'empreinte ci-dessous ne le reflète (code des figures...)
+CACHE_VERSION = 5
+
+
+def _formula_fingerprint(formula):
+    """Bytecode et constantes d'une formule : change quand la formule est modifiée"""
+    code = formula.__code__
+    constants = [c for c in code.co_consts if not isinstance(c, types.CodeType)]
+    return [code.co_code.hex(), repr(constants), list(code.co_names)]
+
+
+def derivation_fingerprint():
+    """Empreinte des calculs qui dérivent le jeu préparé des données sources
+    
+    Couvre le schéma de stockage, le registre des indicateurs (dépendances
+    et formules), le modèle des taux d'exécution et CACHE_VERSION.
+    """
+    return compute_data_version({
+        'cache': CACHE_VERSION,
+        'schema': {'float32_tolerance': FLOAT32_TOLERANCE, 'lolf_levels': LOLF_LEVELS,
+                   'non_additive': NON_ADDITIVE_COLUMNS},
+        'indicators': {name: [indicator.dependencies, _formula_fingerprint(indicator.formula)]
+                       for name, indicator in DERIVED_INDICATORS.items()},
+        'execution_rates': EXECUTION_RATE_MODEL.fingerprint(),
+    })
+
+
+def dataset_version(source):
+    """Version du jeu préparé : contenu de la source et calculs qui en dérivent
+    
+    Une modification du modèle des taux change la version au même titre
+    qu'une révision des données : caches et exports ne servent pas
+    d'anciennes valeurs.
+    """
+    return compute_data_version([source.fingerprint(), derivation_fingerprint()])
+
+
+# Année d'entrée en vigueur de la LOLF, rupture par défaut des comparaisons avant/après
+LOLF_REFORM_YEAR = 2006
+
+AGGREGATE_STATISTICS = ('mean', 'min', 'max', 'sum', 'count')
+
+
+class BudgetDataset:
+    """Jeu de données préparé une seule fois et partagé en lecture seule entre les sessions
+    
+    Un index (année, puis année × mission quand l'année seule ne suffit pas
+    à identifier une ligne) associe chaque clé à sa position : les accès
+    ponctuels se font en temps constant, sans parcourir le DataFrame.
+    """
+    
+    def __init__(self, df, version, index_columns=('year', 'mission')):
+        self._df = df
+        self.version = version
+        index_columns = [c for c in index_columns if c in df.columns]
+        while len(index_columns) > 1 and not df.duplicated(index_columns[:-1]).any():
+            index_columns.pop()
+        self.index_columns = tuple(index_columns)
+        keys = zip(*(df[c].tolist() for c in self.index_columns))
+        if len(self.index_columns) == 1:
+            keys = (key[0] for key in keys)
+        self._positions = {key: position for position, key in enumerate(keys)}
+        self._cubes = {}
+        self._range_stats = {}
+        self._projections = {}
+    
+    def project(self, columns):
+        """Jeu de même version restreint aux colonnes données (et aux colonnes d'index)
+        
+        Projection en mémoire d'un jeu déjà lu (la lecture de la source est
+        limitée par BudgetStore.columns) : les colonnes absentes du jeu sont
+        ignorées. Chaque projection est construite une fois par version,
+        avec ses propres cubes.
+        """
+        columns = tuple(c for c in dict.fromkeys((*self.index_columns, *columns)) if c in self._df.columns)
+        projection = self._projections.get(columns)
+        if projection is None:
+            projection = self._projections.setdefault(
+                columns, BudgetDataset(self._df[list(columns)], self.version, self.index_columns)
+            )
+        return projection
+    
+    def position(self, *key):
+        """Position de la ligne correspondant à la clé (année[, mission])"""
+        return self._positions[key[0] if len(key) == 1 else key]
+    
+    def row(self, *key):
+        """Ligne complète pour une clé, ex. row(2025)"""
+        return self._df.iloc[self.position(*key)]
+    
+    def value(self, column, *key):
+        """Valeur d'une colonne pour une clé, ex. value('dette_pib_%', 2025)"""
+        return self._df[column].to_numpy()[self.position(*key)]
+    
+    def view(self):
+        """Retourne une vue du DataFrame partagé propre à un rerun
+        
+        La copie superficielle ne duplique pas les données : avec le
+        Copy-on-Write de pandas, toute modification faite par une session
+        (ajout de colonne, affectation) reste locale et n'altère jamais
+        le jeu partagé.
+        """
+        return self._df.copy(deep=False)
+    
+    def cube(self, breakpoints=(LOLF_REFORM_YEAR,)):
+        """Cube d'agrégats pour un découpage en périodes, construit une fois par version"""
+        breakpoints = tuple(sorted(set(breakpoints)))
+        cube = self._cubes.get(breakpoints)
+        if cube is None:
+            # Table d'agrégats partagée via le cache disque ; la projection de colonnes fait partie de la clé
+            table = disk_cached('aggregate', 'cube', (breakpoints, tuple(self._df.columns)), self.version,
+                                lambda: AggregateCube(self._df, breakpoints).table)
+            cube = self._cubes.setdefault(breakpoints, AggregateCube(self._df, breakpoints, table=table))
+        return cube
+    
+    def range_stats(self, column):
+        """Structure de requêtes par intervalle d'années pour une colonne, construite une fois par version"""
+        stats = self._range_stats.get(column)
+        if stats is None:
+            stats = self._range_stats.setdefault(
+                column, RangeStats(self._df['year'].to_numpy(), self._df[column].to_numpy())
+            )
+        return stats
+
+
+class AggregateCube:
+    """Statistiques (moyenne, min, max, somme, effectif) de chaque indicateur par période
+    
+    Les années sont découpées en périodes consécutives par les ruptures
+    (`breakpoints`) : (2006,) donne 2002-2005 et 2006-2025. Toutes les
+    statistiques sont calculées en un seul groupby ; une comparaison entre
+    périodes est ensuite une simple lecture dans la table.
+    """
+    
+    def __init__(self, df, breakpoints, columns=None, table=None):
+        years = df['year'].to_numpy()
+        first, last = int(years.min()), int(years.max())
+        self.breakpoints = tuple(b for b in sorted(set(breakpoints)) if first < b <= last)
+        edges = [first, *self.breakpoints, last + 1]
+        self.periods = [(start, end - 1) for start, end in zip(edges[:-1], edges[1:])]
+        
+        if table is not None:
+            # Table déjà calculée pour les mêmes données et ruptures (cache disque)
+            self.table = table
+            return
+        if columns is None:
+            columns = [c for c in df.columns
+                       if c != 'year' and pd.api.types.is_numeric_dtype(df[c])]
+        codes = np.searchsorted(self.breakpoints, years, side='right')
+        # Une période sans année (ruptures dans un trou de la série) n'a pas de groupe :
+        # ses statistiques valent NaN et son effectif 0
+        table = df[list(columns)].groupby(codes).agg(list(AGGREGATE_STATISTICS))
+        table = table.reindex(range(len(self.periods)))
+        counts = [c for c in table.columns if c[1] == 'count']
+        table[counts] = table[counts].fillna(0).astype(np.int64)
+        table.index = pd.MultiIndex.from_tuples(self.periods, names=['début', 'fin'])
+        self.table = table
+    
+    def period(self, year):
+        """Période (début, fin) contenant une année"""
+        return self.periods[int(np.searchsorted(self.breakpoints, year, side='right'))]
+    
+    def label(self, period):
+        """Libellé d'une période, ex. '2002-2005'"""
+        start, end = period
+        return str(start) if start == end else f"{start}-{end}"
+    
+    def stat(self, column, period, statistic='mean'):
+        """Statistique d'une colonne sur une période (début, fin)"""
+        return self.table.at[period, (column, statistic)]
+    
+    def statistics(self, columns, statistic='mean'):
+        """Table périodes × colonnes pour une statistique"""
+        return self.table.xs(statistic, axis=1, level=1)[list(columns)]
+
+
+class RangeStats:
+    """Moyenne, minimum et maximum d'une série sur n'importe quel intervalle d'années en O(1)
+    
+    Sommes et effectifs cumulés donnent la moyenne ; des tables creuses
+    (minimum et maximum sur chaque bloc de 2^k lignes) donnent les extrêmes
+    en combinant deux blocs qui se chevauchent. Une table dense année →
+    position évite toute recherche : déplacer le curseur de période ne
+    parcourt plus la série. Les valeurs manquantes sont ignorées, comme
+    dans pandas.
+    """
+    
+    def __init__(self, years, values):
+        order = np.argsort(years, kind='stable')
+        years = np.asarray(years)[order].astype(np.int64)
+        values = np.asarray(values, dtype=np.float64)[order]
+        valid = ~np.isnan(values)
+        
+        self.first_year, self.last_year = int(years[0]), int(years[-1])
+        # Position de la première ligne de chaque année (et de l'année suivant la dernière)
+        self._starts = np.searchsorted(years, np.arange(self.first_year, self.last_year + 2))
+        
+        self._sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+        self._counts = np.concatenate(([0], np.cumsum(valid)))
+        
+        self._minima, self._maxima = [values], [values]
+        width = 1
+        while 2 * width <= len(values):
+            self._minima.append(np.fmin(self._minima[-1][:-width], self._minima[-1][width:]))
+            self._maxima.append(np.fmax(self._maxima[-1][:-width], self._maxima[-1][width:]))
+            width *= 2
+    
+    def _bounds(self, start, end):
+        start = min(max(start, self.first_year), self.last_year + 1)
+        end = min(max(end, self.first_year - 1), self.last_year)
+        lo = self._starts[start - self.first_year]
+        hi = self._starts[end + 1 - self.first_year]
+        return lo, hi
+    
+    def mean(self, start, end):
+        lo, hi = self._bounds(start, end)
+        count = self._counts[hi] - self._counts[lo] if hi > lo else 0
+        return (self._sums[hi] - self._sums[lo]) / count if count else np.nan
+    
+    def _extreme(self, table, combine, start, end):
+        lo, hi = self._bounds(start, end)
+        if hi <= lo:
+            return np.nan
+        level = int(hi - lo).bit_length() - 1
+        return combine(table[level][lo], table[level][hi - (1 << level)])
+    
+    def min(self, start, end):
+        return self._extreme(self._minima, np.fmin, start, end)
+    
+    def max(self, start, end):
+        return self._extreme(self._maxima, np.fmax, start, end)
+
+
+# Changements entre deux lectures d'une source : années ajoutées, années et colonnes
+# révisées ; `rebuilt` quand le jeu doit être reconstruit (colonnes ou années retirées)
+BudgetChange = namedtuple('BudgetChange', ['added_years', 'changed_years', 'changed_columns', 'rebuilt'])
+
+
+def diff_budget_years(old, new):
+    """Compare deux jeux au grain annuel"""
+    old, new = old.set_index('year'), new.set_index('year')
+    if set(old.columns) != set(new.columns) or not old.index.isin(new.index).all():
+        return BudgetChange((), (), tuple(new.columns), True)
+    
+    common = new.loc[old.index, old.columns]
+    differs = (common != old) & ~(common.isna() & old.isna())
+    return BudgetChange(
+        tuple(new.index.difference(old.index).tolist()),
+        tuple(differs.index[differs.any(axis=1)].tolist()),
+        tuple(differs.columns[differs.any(axis=0)].tolist()),
+        False
+    )
+
+
+def invalidated_columns(change):
+    """Colonnes (de base et dérivées) dont les valeurs ont pu changer ; None : toutes"""
+    if change.rebuilt or change.added_years:
+        return None
+    return set(change.changed_columns).union(affected_indicators(change.changed_columns))
+
+
+def apply_budget_change(df, base, change):
+    """Applique au jeu préparé les années ajoutées ou révisées de `base`
+    
+    Seules les lignes révisées sont modifiées et seuls les indicateurs
+    dépendant des colonnes révisées y sont recalculés ; les nouvelles
+    années sont préparées seules puis ajoutées.
+    """
+    if change.rebuilt:
+        return prepare_budget_frame(base)
+    
+    # Révisions calculées en float64, le jeu révisé est recompacté à la fin
+    df = widen_budget_schema(df)
+    base = base.set_index('year')
+    if change.changed_years:
+        columns = list(change.changed_columns)
+        rows = df['year'].isin(change.changed_years)
+        patched = df.loc[rows].copy()
+        patched[columns] = base.loc[patched['year'], columns].to_numpy()
+        patched = refresh_indicators(patched, columns)
+        df.loc[rows, patched.columns] = patched
+    if change.added_years:
+        new_rows = simulate_execution_rates(base.loc[list(change.added_years)].reset_index())
+        df = append_indicator_rows(df, new_rows).sort_values('year').reset_index(drop=True)
+    return apply_budget_schema(df)
+
+
+store_logger = logging.getLogger('budget_dashboard.store')
+
+
+class BudgetStore:
+    """Jeu de données courant d'une source, rafraîchi sans redémarrer le serveur
+    
+    Quand l'empreinte de la source change, seules les années ajoutées ou
+    révisées sont appliquées au jeu préparé (voir apply_budget_change), puis
+    la version est incrémentée. Les figures en cache qui ne dépendent pas
+    des colonnes révisées sont reportées sur la nouvelle version ; les autres
+    sont recalculées. Les sessions voient les nouvelles données à leur
+    prochain rerun. Pour une source répertoire, seuls les fichiers modifiés
+    sont relus. Un jeu déjà préparé (write_prepared_dataset) est servi tel
+    quel, avec la version inscrite dans le fichier.
+    """
+    
+    def __init__(self, source, figure_cache=None, columns=None):
+        self.source = source
+        self.figure_cache = figure_cache
+        # Seules les colonnes utiles aux vues sont lues dans la source
+        self.columns = dashboard_columns() if columns is None else source_columns(columns)
+        self.last_change = None
+        self._lock = threading.Lock()
+        self._file_frames = {}
+        self._stop = threading.Event()
+        self._watcher = None
+        
+        self._source_version = dataset_version(source)
+        self._base = self._read_base()
+        prepared = self._base.attrs.get(PREPARED_VERSION_KEY)
+        self.dataset = BudgetDataset(self._base if prepared else prepare_budget_frame(self._base),
+                                     prepared or self._source_version)
+    
+    def _read_base(self):
+        if not isinstance(self.source, DirectorySource):
+            df = self.source.read(self.columns)
+            return df if df.attrs.get(PREPARED_VERSION_KEY) else aggregate_to_year(df)
+        
+        # Chaque fichier est gardé au grain annuel, en float64 : le schéma compact
+        # n'est appliqué qu'au jeu préparé, après la somme de tous les fichiers
+        files = self.source.files()
+        frames = {}
+        for path, stat in files.items():
+            cached = self._file_frames.get(path)
+            frames[path] = (cached if cached and cached[0] == stat
+                            else (stat, aggregate_to_year(self.source.read_file(path, self.columns))))
+        self._file_frames = frames
+        if not frames:
+            raise ValueError(f"Aucun fichier de données dans {self.source.path}")
+        return aggregate_to_year(pd.concat([frame for _, frame in frames.values()], ignore_index=True))
+    
+    def refresh(self):
+        """Applique les changements de la source ; retourne le BudgetChange, ou None si rien n'a changé"""
+        if dataset_version(self.source) == self._source_version:
+            return None
+        with self._lock:
+            source_version = dataset_version(self.source)
+            previous = self.dataset
+            if source_version == self._source_version:
+                return None
+            
+            base = self._read_base()
+            prepared = base.attrs.get(PREPARED_VERSION_KEY)
+            version = prepared or source_version
+            self._source_version = source_version
+            if version == previous.version:
+                return None
+            change = diff_budget_years(self._base, base)
+            self.dataset = BudgetDataset(base if prepared else apply_budget_change(previous.view(), base, change),
+                                         version)
+            self._base = base
+            self.last_change = change
+            
+            kept = 0
+            if self.figure_cache is not None:
+                columns = invalidated_columns(change)
+                kept = self.figure_cache.rekey(
+                    previous.version, version,
+                    lambda name, params: not figure_depends_on(name, params, columns)
+                )
+            store_logger.info("Données %s -> %s : %d année(s) ajoutée(s), %d révisée(s), "
+                              "colonnes %s ; %d figure(s) conservée(s)",
+                              previous.version, version, len(change.added_years),
+                              len(change.changed_years), list(change.changed_columns), kept)
+            return change
+    
+    def current(self):
+        """Jeu de données à jour ; sans watcher, la source est vérifiée à chaque appel
+        
+        En cas d'erreur de lecture (fichier en cours d'écriture...), le jeu
+        précédent reste servi.
+        """
+        if self._watcher is None:
+            try:
+                self.refresh()
+            except Exception:
+                store_logger.exception("Rafraîchissement des données impossible, version %s conservée",
+                                       self.dataset.version)
+        return self.dataset
+    
+    def watch(self, interval):
+        """Vérifie la source toutes les `interval` secondes dans un thread dédié"""
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    store_logger.exception("Rafraîchissement des données impossible, version %s conservée",
+                                           self.dataset.version)
+        
+        self._watcher = threading.Thread(target=poll, name='budget-store-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop(self):
+        self._stop.set()
+
+
+@st.cache_resource(show_spinner=False)
+def _get_budget_store(path):
+    # `path` (BUDGET_DATA_PATH) identifie la source dans le cache
+    store = BudgetStore(default_source(), get_figure_cache())
+    # Préchargement des figures déjà calculées pour cette version (autre worker, déploiement précédent)
+    warmed = store.figure_cache.warm(store.dataset.version)
+    if warmed:
+        store_logger.info("%d figure(s) préchargée(s) depuis le cache disque", warmed)
+    interval = float(os.environ.get('BUDGET_WATCH_INTERVAL_S', 0))
+    if interval > 0:
+        store.watch(interval)
+    return store
+
+
+def get_budget_store():
+    """Store du jeu de données complet de la source configurée, partagé par le processus
+    
+    BUDGET_WATCH_INTERVAL_S > 0 active la surveillance en arrière-plan ;
+    sinon la source est vérifiée à chaque rerun.
+    """
+    return _get_budget_store(os.environ.get('BUDGET_DATA_PATH'))
+
+
+def load_budget_dataset(columns=None):
+    """Jeu de données courant de la source configurée, via le store du processus
+    
+    `columns` le restreint aux colonnes (de base ou dérivées) utiles à une vue.
+    """
+    dataset = get_budget_store().current()
+    return dataset if columns is None else dataset.project(columns)
+
+
+class LolfHierarchy:
+    """Arborescence mission → programme → action → sous-action avec agrégats précalculés
+    
+    Les sommes de chaque nœud, à chaque niveau et pour chaque année, sont
+    matérialisées une fois à la construction. L'affichage d'un treemap ou
+    l'exploration d'une mission ne font ensuite que des lectures dans des
+    tables déjà agrégées.
+    """
+    
+    def __init__(self, leaves, version, amount_column='montant'):
+        self.version = version
+        self.amount_column = amount_column
+        self.levels = tuple(level for level in LOLF_LEVELS if level in leaves.columns)
+        self.years = sorted(leaves['year'].unique().tolist())
+        
+        # Agrégats par niveau : index (année, chemin jusqu'au niveau)
+        self.rollups = {}
+        for depth, level in enumerate(self.levels):
+            keys = ['year', *self.levels[:depth + 1]]
+            self.rollups[level] = leaves.groupby(keys, sort=True, observed=True)[amount_column].sum()
+        
+        # Nœuds de l'arborescence (tous niveaux confondus) par année et par mission
+        nodes = []
+        for depth, level in enumerate(self.levels):
+            frame = self.rollups[level].reset_index()
+            ids, parents = frame[self.levels[0]].astype(str), ''
+            for parent_level in self.levels[1:depth + 1]:
+                ids, parents = ids + '/' + frame[parent_level].astype(str), ids
+            frame['id'] = ids
+            frame['parent'] = parents
+            frame['label'] = frame[level].astype(str)
+            frame['depth'] = depth
+            nodes.append(frame[['year', 'mission', 'id', 'parent', 'label', 'depth', amount_column]])
+        nodes = pd.concat(nodes, ignore_index=True).rename(columns={amount_column: 'value'})
+        self._nodes = {year: frame.reset_index(drop=True) for year, frame in nodes.groupby('year')}
+        self._mission_nodes = {key: frame.reset_index(drop=True)
+                               for key, frame in nodes.groupby(['year', 'mission'])}
+    
+    def missions(self, year):
+        """Missions présentes une année donnée, par montant décroissant"""
+        return self.rollups['mission'].loc[year].sort_values(ascending=False)
+    
+    def nodes(self, year, mission=None):
+        """Nœuds (id, parent, label, value) d'une année, éventuellement limités à une mission"""
+        if mission is None:
+            return self._nodes[year]
+        return self._mission_nodes[(year, mission)]
+    
+    def children(self, year, mission):
+        """Programmes d'une mission avec leur évolution par rapport à l'année précédente"""
+        programmes = self.rollups['programme'].loc[(year, mission)]
+        table = pd.DataFrame({'Montant (Md€)': programmes})
+        previous_year = year - 1
+        if (previous_year, mission) in self.rollups['programme'].index.droplevel(-1):
+            previous = self.rollups['programme'].loc[(previous_year, mission)]
+            table['Évolution (%)'] = (programmes / previous.reindex(programmes.index) - 1) * 100
+        return table.sort_values('Montant (Md€)', ascending=False)
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _load_lolf_hierarchy(_source, version):
+    # Niveaux de l'arborescence et montant : les autres colonnes ne sont pas lues
+    leaves = apply_budget_schema(_source.read(['montant', 'dépenses', *LOLF_LEVELS]))
+    amount_column = 'montant' if 'montant' in leaves.columns else 'dépenses'
+    return LolfHierarchy(leaves, version, amount_column)
+
+
+def load_lolf_hierarchy():
+    """Arborescence LOLF partagée, lue depuis BUDGET_LEAVES_PATH (None si non configuré)
+    
+    Le fichier contient une ligne par feuille (année, mission, programme
+    [, action[, sous_action]]) et un montant (`montant`, ou à défaut `dépenses`).
+    """
+    path = os.environ.get('BUDGET_LEAVES_PATH')
+    if not path:
+        return None
+    source = source_from_path(path)
+    return _load_lolf_hierarchy(source, dataset_version(source))
+
+
+# Hypothèses des scénarios stochastiques : (moyenne, écart-type)
+# Les taux sont annuels ; les élasticités sont tirées une fois par trajectoire.
+SCENARIO_ASSUMPTIONS = {
+    'croissance_reelle': (0.012, 0.015),
+    'inflation': (0.018, 0.008),
+    'taux_interet': (0.022, 0.006),        # taux apparent sur le stock de dette
+    'elasticite_recettes': (1.0, 0.15),    # recettes / PIB nominal
+    'elasticite_depenses': (0.8, 0.15),    # dépenses primaires / PIB nominal
+}
+
+# Les trajectoires sont tirées par blocs de graines indépendantes : le résultat
+# ne dépend pas du nombre de processus utilisés
+SCENARIO_CHUNK_PATHS = 50_000
+SCENARIO_PERCENTILES = (5, 25, 50, 75, 95)
+# Réglages initiaux et valeurs possibles des curseurs de la vue Projections
+DEFAULT_SCENARIO_HORIZON = 10
+DEFAULT_SCENARIO_PATHS = 10_000
+SCENARIO_HORIZONS = (5, 30)
+SCENARIO_PATH_OPTIONS = (1_000, 5_000, 10_000, 50_000, 100_000)
+# Solde primaire du balayage r − g : (minimum, maximum, pas) en % du PIB
+PRIMARY_BALANCE_RANGE = (-6.0, 6.0, 0.1)
+
+# Bornes des curseurs de période
+ANALYSIS_YEARS = (2002, 2025)
+
+
+def debt_dynamics(initial_debt, primary_balance, interest_rate, growth=0.0):
+    """Dynamique stock-flux de la dette : d_t = d_{t-1} * (1 + r) / (1 + g) - solde primaire_t
+    
+    En ratio du PIB, `growth` est la croissance nominale (effet r − g) ;
+    en niveaux (Md€), on laisse growth = 0. Tous les arguments sont
+    diffusés (broadcasting) ; la dernière dimension est le temps. La
+    récurrence est résolue sans boucle : avec A_t = prod((1 + r) / (1 + g)),
+    d_t = A_t * (d_0 - somme des soldes primaires actualisés par A).
+    """
+    primary_balance = np.asarray(primary_balance, dtype=np.float64)
+    factor = (1 + np.asarray(interest_rate, dtype=np.float64)) / (1 + np.asarray(growth, dtype=np.float64))
+    shape = np.broadcast_shapes(np.shape(initial_debt) + (1,), primary_balance.shape, factor.shape)
+    accumulation = np.cumprod(np.broadcast_to(factor, shape), axis=-1)
+    discounted_balance = np.cumsum(np.broadcast_to(primary_balance, shape) / accumulation, axis=-1)
+    return accumulation * (np.expand_dims(initial_debt, -1) - discounted_balance)
+
+
+def debt_sweep(initial_ratio, primary_balance_ratio, growth_grid, rate_grid, horizon):
+    """Ratio de dette final pour chaque couple (taux d'intérêt, croissance nominale)
+    
+    Toute la grille est évaluée en une seule opération : le résultat a la
+    forme (len(rate_grid), len(growth_grid)).
+    """
+    rates = np.asarray(rate_grid, dtype=np.float64)[:, None, None]
+    growths = np.asarray(growth_grid, dtype=np.float64)[None, :, None]
+    balance = np.full(horizon, primary_balance_ratio, dtype=np.float64)
+    return debt_dynamics(initial_ratio, balance, rates, growths)[..., -1]
+
+
+def _simulate_paths(start, horizon, n_paths, seed_sequence, assumptions):
+    """Simule un bloc de trajectoires ; chaque variable est un tableau (trajectoires, années)"""
+    rng = np.random.default_rng(seed_sequence)
+    shape = (n_paths, horizon)
+    
+    def draw(name, size):
+        mean, std = assumptions[name]
+        return rng.normal(mean, std, size)
+    
+    growth = draw('croissance_reelle', shape)
+    inflation = draw('inflation', shape)
+    rate = draw('taux_interet', shape)
+    revenue_elasticity = draw('elasticite_recettes', (n_paths, 1))
+    spending_elasticity = draw('elasticite_depenses', (n_paths, 1))
+    
+    nominal_growth = (1 + growth) * (1 + inflation) - 1
+    pib = start['pib'] * np.cumprod(1 + nominal_growth, axis=1)
+    recettes = start['recettes'] * np.cumprod(1 + revenue_elasticity * nominal_growth, axis=1)
+    # Les dépenses observées incluent la charge d'intérêts (déficit = recettes - dépenses) :
+    # seules les dépenses primaires (hors intérêts au taux moyen sur la dette initiale) suivent le PIB
+    primary_spending = start['dépenses'] - assumptions['taux_interet'][0] * start['dette']
+    primary_spending = primary_spending * np.cumprod(1 + spending_elasticity * nominal_growth, axis=1)
+    
+    # Dette en niveaux : D_t = D_{t-1} * (1 + r_t) - solde primaire_t ; les intérêts
+    # r_t * D_{t-1} ne sont comptés qu'une fois, dans les dépenses et le solde total
+    primary_balance = recettes - primary_spending
+    dette = debt_dynamics(np.full(n_paths, start['dette']), primary_balance, rate)
+    previous_debt = np.concatenate([np.full((n_paths, 1), start['dette']), dette[:, :-1]], axis=1)
+    interest = rate * previous_debt
+    dépenses = primary_spending + interest
+    déficit = recettes - dépenses
+    
+    return {
+        'pib': pib,
+        'recettes': recettes,
+        'dépenses': dépenses,
+        'déficit': déficit,
+        'dette': dette,
+        'déficit_pib_%': déficit / pib * 100,
+        'dette_pib_%': dette / pib * 100,
+    }
+
+
+def simulate_scenarios(start, horizon=10, n_paths=10_000, seed=2025, assumptions=None, workers=1):
+    """Projette `n_paths` trajectoires stochastiques sur `horizon` années
+    
+    `start` contient les niveaux de la dernière année observée (recettes,
+    dépenses, dette, pib). Avec `workers` > 1, les blocs de trajectoires
+    sont répartis sur un pool de processus.
+    """
+    assumptions = assumptions or SCENARIO_ASSUMPTIONS
+    start = {key: float(start[key]) for key in ('recettes', 'dépenses', 'dette', 'pib')}
+    chunks = [min(SCENARIO_CHUNK_PATHS, n_paths - offset)
+              for offset in range(0, n_paths, SCENARIO_CHUNK_PATHS)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    arguments = [(start, horizon, size, seed_sequence, assumptions)
+                 for size, seed_sequence in zip(chunks, seeds)]
+    
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            results = list(pool.map(_simulate_paths, *zip(*arguments)))
+    else:
+        results = [_simulate_paths(*args) for args in arguments]
+    
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+
+def scenario_percentiles(paths, first_year, percentiles=SCENARIO_PERCENTILES):
+    """Résume les trajectoires en tables de percentiles (une par variable, indexées par année)"""
+    summary = {}
+    for name, values in paths.items():
+        table = np.percentile(values, percentiles, axis=0).T
+        summary[name] = pd.DataFrame(
+            table,
+            index=pd.Index(range(first_year, first_year + values.shape[1]), name='year'),
+            columns=[f"p{p}" for p in percentiles]
+        )
+    return summary
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def run_scenarios(version, start, first_year, horizon, n_paths, seed=2025):
+    """Percentiles des scénarios, mis en cache par version des données et paramètres
+    
+    Le résultat est aussi conservé dans le cache disque (BUDGET_DISK_CACHE_DIR).
+    BUDGET_SCENARIO_WORKERS fixe le nombre de processus utilisés pour les gros volumes.
+    """
+    def compute():
+        workers = int(os.environ.get('BUDGET_SCENARIO_WORKERS', 1))
+        paths = simulate_scenarios(start, horizon, n_paths, seed, workers=workers)
+        return scenario_percentiles(paths, first_year)
+    
+    params = (tuple(sorted(start.items())), first_year, horizon, n_paths, seed)
+    return disk_cached('scenarios', 'run_scenarios', params, version, compute)
+
+
+# Indicateurs proposés dans la vue Comparaisons
+COMPARISON_INDICATORS = {
+    'recettes': 'Recettes (Md€)',
+    'dépenses': 'Dépenses (Md€)',
+    'déficit': 'Déficit (Md€)',
+    'dette': 'Dette (Md€)',
+    'pib': 'PIB (Md€)',
+    'déficit_pib_%': 'Déficit/PIB (%)',
+    'dette_pib_%': 'Dette/PIB (%)',
+    'score_gestion_lolf': 'Score LOLF'
+}
+
+
+# Colonnes lues par chaque figure de plot_figure (les paramètres `indicator` s'y ajoutent).
+# Une figure absente du registre est considérée comme dépendant de toutes les colonnes.
+FIGURE_DEPENDENCIES = {
+    'evolution': ('recettes', 'recettes_impôts', 'recettes_tva', 'dépenses', 'dépenses_éducation',
+                  'dépenses_santé', 'dépenses_défense', 'déficit_pib_%', 'dette_pib_%'),
+    'lolf_indicators': ('taux_execution_recettes', 'taux_execution_dépenses', 'score_gestion_lolf'),
+    'lolf_comparison': ('déficit_pib_%', 'dette_pib_%', 'taux_execution_recettes', 'score_gestion_lolf'),
+    'sector_amounts': ('dépenses_éducation', 'dépenses_santé', 'dépenses_défense'),
+    'sector_gdp_share': ('éducation_pib_%', 'santé_pib_%', 'défense_pib_%'),
+    'sector_splits': ('recettes', 'recettes_impôts', 'recettes_tva', 'dépenses', 'dépenses_éducation',
+                      'dépenses_santé', 'dépenses_défense'),
+    'missions_budget': (),
+    'missions_evolution': (),
+    'missions_treemap': (),
+    'missions_sunburst': (),
+    'comparison': (),
+    'forecast_amounts': ('recettes', 'dépenses', 'déficit', 'pib', 'déficit_pib_%', 'dette_pib_%'),
+    'forecast_ratios': ('recettes', 'dépenses', 'déficit', 'pib', 'déficit_pib_%', 'dette_pib_%'),
+    'scenario_debt': ('recettes', 'dépenses', 'dette', 'pib', 'dette_pib_%'),
+    'scenario_deficit': ('recettes', 'dépenses', 'dette', 'pib', 'déficit_pib_%'),
+    'debt_sweep': ('dette_pib_%',),
+}
+
+
+# Colonnes lues par l'en-tête, affiché au-dessus de toutes les vues
+HEADER_COLUMNS = ('déficit_pib_%', 'dette_pib_%', 'score_gestion_lolf', 'recettes', 'dépenses')
+
+# Colonnes lues par chaque vue (figures, métriques, tables) : la vue est rendue sur une
+# projection du jeu limitée à ces colonnes
+VIEW_COLUMNS = {
+    "Vue d'ensemble": (*FIGURE_DEPENDENCIES['evolution'],
+                       'score_gestion_lolf', 'recettes_pib_%', 'dépenses_pib_%'),
+    "Analyse LOLF": (*FIGURE_DEPENDENCIES['lolf_indicators'], *FIGURE_DEPENDENCIES['lolf_comparison']),
+    "Analyse sectorielle": (*FIGURE_DEPENDENCIES['sector_amounts'], *FIGURE_DEPENDENCIES['sector_gdp_share'],
+                            *FIGURE_DEPENDENCIES['sector_splits']),
+    "Comparaisons": tuple(COMPARISON_INDICATORS),
+    "Projections": (*FIGURE_DEPENDENCIES['forecast_amounts'], 'dette'),
+}
+
+
+def source_columns(columns):
+    """Colonnes à lire dans une source pour disposer de `columns`
+    
+    Les indicateurs dérivés sont remplacés transitivement par leurs entrées
+    (les taux d'exécution viennent du modèle). Les colonnes dérivées restent
+    demandées : un jeu déjà préparé (serve.py) les contient, une source
+    brute non, et les colonnes absentes sont ignorées à la lecture.
+    """
+    required = dict.fromkeys(columns)
+    pending = list(required)
+    while pending:
+        indicator = DERIVED_INDICATORS.get(pending.pop())
+        for dependency in indicator.dependencies if indicator else ():
+            if dependency not in required:
+                required[dependency] = None
+                pending.append(dependency)
+    return tuple(required)
+
+
+def dashboard_columns():
+    """Colonnes de la source lues par le dashboard : en-tête et toutes les vues"""
+    return source_columns([*HEADER_COLUMNS, *(c for columns in VIEW_COLUMNS.values() for c in columns)])
+
+
+def figure_depends_on(name, params, columns):
+    """Indique si une figure lit l'une des colonnes données (`columns=None` : toutes)"""
+    dependencies = FIGURE_DEPENDENCIES.get(name)
+    if dependencies is None:
+        return True
+    dependencies = set(dependencies)
+    if 'indicator' in params:
+        dependencies.add(params['indicator'])
+    if columns is None:
+        return bool(dependencies)
+    return bool(dependencies.intersection(columns))
+
+
+# Rendu des longues séries : au-delà de ce nombre de points par trace, passage en WebGL
+WEBGL_POINT_THRESHOLD = 5_000
+# Largeur de référence d'un graphique pleine largeur (px) : une série n'a pas besoin
+# de plus d'un point par pixel
+CHART_WIDTH_PX = int(os.environ.get('BUDGET_CHART_WIDTH_PX', 1400))
+
+
+def _lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets : indices des points retenus (extrémités incluses)"""
+    n = len(x)
+    bucket_edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = bucket_edges[i], bucket_edges[i + 1]
+        next_start, next_end = end, bucket_edges[i + 2] if i + 2 < n_out - 1 else n
+        # Sommet « moyen » du bucket suivant
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        # Point du bucket courant formant le plus grand triangle avec le précédent retenu
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous]) -
+            (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def _minmax_indices(y, n_buckets):
+    """Présélection vectorisée : minimum et maximum de chaque bucket, dans l'ordre"""
+    n = len(y)
+    bucket_size = n // n_buckets
+    usable = bucket_size * n_buckets
+    blocks = y[:usable].reshape(n_buckets, bucket_size)
+    offsets = np.arange(n_buckets) * bucket_size
+    indices = np.concatenate([offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1)])
+    return np.unique(np.concatenate([[0], indices, np.arange(usable, n)]))
+
+
+def _downsample_indices(x, y, n_out):
+    """Indices retenus par MinMaxLTTB pour une série sans valeur manquante"""
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    candidates = _minmax_indices(y, min(n_out * 4, len(y) // 2))
+    if len(candidates) > n_out:
+        candidates = candidates[_lttb_indices(x[candidates], y[candidates], n_out)]
+    return candidates
+
+
+def downsample(x, y, n_out):
+    """Réduit une série à `n_out` points en préservant sa forme (MinMaxLTTB)
+    
+    Une présélection min/max vectorisée conserve les extrêmes de chaque
+    bucket, puis LTTB choisit parmi eux les points les plus représentatifs.
+    Les valeurs manquantes sont écartées de la sélection ; un point NaN est
+    gardé par trou pour que la courbe reste interrompue. Le minimum et le
+    maximum de la série sont toujours conservés.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) <= n_out or n_out < 3:
+        return x, y
+    
+    valid = ~np.isnan(y)
+    points = np.flatnonzero(valid)
+    if not len(points):
+        return x[:1], y[:1]
+    selected = points[_downsample_indices(x[points], y[points], n_out)]
+    extremes = points[[np.argmin(y[points]), np.argmax(y[points])]]
+    gaps = np.flatnonzero(~valid & np.concatenate([[True], valid[:-1]]))
+    indices = np.unique(np.concatenate([selected, extremes, gaps]))
+    return x[indices], y[indices]
+
+
+def line_trace(x, y, max_points, **kwargs):
+    """Trace de courbe adaptée au volume : sous-échantillonnée et en WebGL pour les longues séries"""
+    if len(x) > max_points:
+        x, y = downsample(x, y, max_points)
+    trace_type = go.Scattergl if len(x) > WEBGL_POINT_THRESHOLD else go.Scatter
+    return trace_type(x=x, y=y, **kwargs)
+
+
+def _frame_to_ipc(df):
+    pa = _require_pyarrow()
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _frame_from_ipc(data):
+    pa = _require_pyarrow()
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+# Clé des tables d'un dictionnaire de tables, dans la table concaténée
+_CACHE_DICT_LEVEL = '__cle__'
+
+
+def encode_cache_value(value):
+    """(format, octets) d'une valeur du cache disque
+    
+    Seuls des formats de données sont écrits : texte (spécifications JSON
+    des figures), table pandas ou dictionnaire de tables (flux Arrow IPC).
+    Rien n'est désérialisé en objets Python arbitraires à la lecture.
+    """
+    if isinstance(value, str):
+        return 'text', value.encode('utf-8')
+    if isinstance(value, pd.DataFrame):
+        return 'arrow', _frame_to_ipc(value)
+    if isinstance(value, dict) and value and all(isinstance(v, pd.DataFrame) for v in value.values()):
+        return 'arrow-dict', _frame_to_ipc(pd.concat(value, names=[_CACHE_DICT_LEVEL]))
+    raise TypeError(f"Valeur non prise en charge par le cache disque : {type(value).__name__}")
+
+
+def decode_cache_value(value_format, data):
+    """Inverse d'encode_cache_value"""
+    if value_format == 'text':
+        return data.decode('utf-8')
+    if value_format == 'arrow':
+        return _frame_from_ipc(data)
+    if value_format == 'arrow-dict':
+        frame = _frame_from_ipc(data)
+        return {key: frame.xs(key, level=_CACHE_DICT_LEVEL)
+                for key in frame.index.unique(level=_CACHE_DICT_LEVEL)}
+    raise ValueError(f"Format d'entrée inconnu : {value_format}")
+
+
+class DiskCache:
+    """Cache persistant de résultats (SQLite), partagé entre processus et entre déploiements
+    
+    Chaque entrée est adressée par le condensé de ce qui la détermine :
+    type de résultat, nom, paramètres et version des données. Une même
+    entrée calculée par un worker sert donc tous les autres, et survit au
+    redémarrage du serveur. Les valeurs (spécifications JSON des figures,
+    tables pandas en Arrow IPC) sont compressées ; au-delà de `max_bytes`,
+    les entrées les moins récemment lues sont supprimées.
+    """
+    
+    def __init__(self, directory, max_bytes):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'results.sqlite')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._connection() as connection:
+            # Anciennes entrées sérialisées avec pickle : jamais relues
+            connection.execute("DROP TABLE IF EXISTS entries")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY, kind TEXT, name TEXT, params TEXT, version TEXT,
+                    format TEXT, value BLOB, size INTEGER, accessed REAL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+            connection.execute("CREATE INDEX IF NOT EXISTS results_version ON results (kind, version)")
+    
+    def _connection(self):
+        # Une connexion par thread ; WAL : lectures concurrentes pendant une écriture
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    @staticmethod
+    def key(kind, name, params, version):
+        """Condensé d'une entrée ; les paramètres sont des tuples de valeurs littérales"""
+        payload = repr((kind, name, params, version))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def get(self, kind, name, params, version):
+        """Valeur en cache, ou None"""
+        key = self.key(kind, name, params, version)
+        connection = self._connection()
+        row = connection.execute("SELECT format, value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        try:
+            value = decode_cache_value(row[0], zlib.decompress(row[1]))
+        except Exception:
+            # Entrée illisible (autre version des bibliothèques...) : supprimée et recalculée
+            with connection:
+                connection.execute("DELETE FROM results WHERE key = ?", (key,))
+            self.misses += 1
+            return None
+        with connection:
+            connection.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        self.hits += 1
+        return value
+    
+    def contains(self, kind, name, params, version):
+        row = self._connection().execute(
+            "SELECT 1 FROM results WHERE key = ?", (self.key(kind, name, params, version),)
+        ).fetchone()
+        return row is not None
+    
+    def put(self, kind, name, params, version, value):
+        try:
+            value_format, data = encode_cache_value(value)
+        except ImportError:
+            # Tables sans pyarrow : résultat non conservé
+            return
+        blob = zlib.compress(data, 1)
+        if len(blob) > self.max_bytes:
+            return
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.key(kind, name, params, version), kind, name, repr(params), version,
+                 value_format, blob, len(blob), time.time())
+            )
+        self._evict()
+    
+    def get_or_compute(self, kind, name, params, version, compute):
+        value = self.get(kind, name, params, version)
+        if value is None:
+            value = compute()
+            self.put(kind, name, params, version, value)
+        return value
+    
+    def _evict(self):
+        """Supprime les entrées les moins récemment lues jusqu'à repasser sous la taille maximale"""
+        connection = self._connection()
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        with connection:
+            connection.executemany("DELETE FROM results WHERE key = ?", evicted)
+    
+    def entries(self, kind, version):
+        """(nom, paramètres, valeur) des entrées d'une version, les plus récemment lues d'abord"""
+        rows = self._connection().execute(
+            "SELECT name, params, format, value FROM results WHERE kind = ? AND version = ? "
+            "ORDER BY accessed DESC",
+            (kind, version)
+        )
+        for name, params, value_format, blob in rows:
+            yield name, ast.literal_eval(params), decode_cache_value(value_format, zlib.decompress(blob))
+    
+    def rekey(self, kind, old_version, new_version, keep):
+        """Copie vers `new_version` les entrées de `old_version` pour lesquelles keep(nom, paramètres)"""
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT name, params, format, value, size FROM results WHERE kind = ? AND version = ?",
+            (kind, old_version)
+        ).fetchall()
+        now = time.time()
+        copies = []
+        for name, params_repr, value_format, blob, size in rows:
+            params = ast.literal_eval(params_repr)
+            if keep(name, dict(params)):
+                copies.append((self.key(kind, name, params, new_version), kind, name, params_repr,
+                               new_version, value_format, blob, size, now))
+        with connection:
+            connection.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", copies)
+        self._evict()
+        return len(copies)
+    
+    def clear(self):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM results")
+    
+    def stats(self):
+        entries, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+
+@st.cache_resource(show_spinner=False)
+def get_disk_cache():
+    """Cache disque unique par processus, activé par BUDGET_DISK_CACHE_DIR (None sinon)
+    
+    BUDGET_DISK_CACHE_MB fixe sa taille maximale (1024 Mo par défaut).
+    """
+    directory = os.environ.get('BUDGET_DISK_CACHE_DIR')
+    if not directory:
+        return None
+    max_mb = float(os.environ.get('BUDGET_DISK_CACHE_MB', 1024))
+    return DiskCache(directory, int(max_mb * 1024 * 1024))
+
+
+def disk_cached(kind, name, params, version, compute):
+    """Résultat de compute() lu dans le cache disque ou calculé puis enregistré (calcul direct sans cache)"""
+    disk = get_disk_cache()
+    if disk is None:
+        return compute()
+    return disk.get_or_compute(kind, name, params, version, compute)
+
+
+# Place occupée en mémoire par un objet Figure, relativement à sa spécification JSON
+FIGURE_OBJECT_FACTOR = 3
+
+
+class FigureCache:
+    """Cache LRU des spécifications JSON des figures, borné en mémoire et partagé entre sessions
+    
+    Avec un cache disque (`disk`), une figure absente de la mémoire est
+    d'abord cherchée sur disque, et chaque figure calculée y est enregistrée.
+    L'objet Figure d'une entrée peut être gardé en mémoire à côté de sa
+    spécification (compté dans la taille) : il n'est alors pas reconstruit.
+    """
+    
+    def __init__(self, max_bytes, disk=None):
+        self.max_bytes = max_bytes
+        self.disk = disk
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._figures = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return spec
+        
+        spec = self.disk.get('figure', *key) if self.disk is not None else None
+        with self._lock:
+            if spec is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._insert(key, spec)
+        return spec
+    
+    def put(self, key, spec, figure=None):
+        self._insert(key, spec, figure)
+        if self.disk is not None:
+            self.disk.put('figure', *key, spec)
+    
+    def figure(self, key):
+        """Objet Figure gardé pour une entrée en mémoire, ou None"""
+        with self._lock:
+            return self._figures.get(key)
+    
+    def attach(self, key, figure):
+        """Garde l'objet Figure d'une entrée déjà en mémoire"""
+        with self._lock:
+            spec = self._entries.get(key)
+            if spec is None or key in self._figures:
+                return
+            self._figures[key] = figure
+            self.size += FIGURE_OBJECT_FACTOR * sys.getsizeof(spec)
+            self._evict()
+    
+    def _entry_size(self, key, spec):
+        return sys.getsizeof(spec) * (1 + FIGURE_OBJECT_FACTOR * (key in self._figures))
+    
+    def warm(self, version):
+        """Charge depuis le disque les figures d'une version, dans la limite de la taille en mémoire
+        
+        Retourne le nombre de figures chargées.
+        """
+        if self.disk is None:
+            return 0
+        loaded = 0
+        for name, params, spec in self.disk.entries('figure', version):
+            if self.size + sys.getsizeof(spec) > self.max_bytes:
+                break
+            self._insert((name, params, version), spec)
+            loaded += 1
+        return loaded
+    
+    def _insert(self, key, spec, figure=None):
+        if sys.getsizeof(spec) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= self._entry_size(key, previous)
+                self._figures.pop(key, None)
+            if figure is not None:
+                self._figures[key] = figure
+            self._entries[key] = spec
+            self.size += self._entry_size(key, spec)
+            self._evict()
+    
+    def _evict(self):
+        # Éviction des entrées les moins récemment utilisées
+        while self.size > self.max_bytes and self._entries:
+            key, evicted = self._entries.popitem(last=False)
+            self.size -= self._entry_size(key, evicted)
+            self._figures.pop(key, None)
+    
+    def rekey(self, old_version, new_version, keep):
+        """Reporte sur `new_version` les entrées de `old_version` pour lesquelles keep(nom, paramètres)
+        
+        Les autres entrées (figures à recalculer, versions antérieures) sont
+        supprimées. Retourne le nombre d'entrées conservées.
+        """
+        with self._lock:
+            entries, figures = OrderedDict(), {}
+            for key, spec in self._entries.items():
+                name, params, version = key
+                if version == new_version:
+                    new_key = key
+                elif version == old_version and keep(name, dict(params)):
+                    new_key = (name, params, new_version)
+                else:
+                    continue
+                entries[new_key] = spec
+                if key in self._figures:
+                    figures[new_key] = self._figures[key]
+            kept = len(entries)
+            self._entries, self._figures = entries, figures
+            self.size = sum(self._entry_size(key, spec) for key, spec in entries.items())
+        if self.disk is not None:
+            self.disk.rekey('figure', old_version, new_version, keep)
+        return kept
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._figures.clear()
+            self.size = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Cache de figures unique par processus (taille max : BUDGET_FIGURE_CACHE_MB, 64 Mo par défaut)
+    
+    Il s'appuie sur le cache disque quand BUDGET_DISK_CACHE_DIR est défini.
+    """
+    max_mb = float(os.environ.get('BUDGET_FIGURE_CACHE_MB', 64))
+    return FigureCache(int(max_mb * 1024 * 1024), get_disk_cache())
+
+
+# Bornes (s) de l'histogramme des temps de rendu exposé au format Prometheus
+RENDER_TIME_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+metrics_logger = logging.getLogger('budget_dashboard.metrics')
+
+
+class ViewMetrics:
+    """Mesures agrégées par vue (temps réel, temps CPU, allocations, poids des figures)"""
+    
+    def __init__(self, history=200):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.recent = deque(maxlen=history)
+    
+    def record(self, sample):
+        with self._lock:
+            view = self._views.setdefault(sample['view'], {
+                'count': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'wall_max_s': 0.0,
+                'alloc_peak_bytes': 0, 'figure_bytes': 0,
+                'buckets': [0] * len(RENDER_TIME_BUCKETS),
+            })
+            view['count'] += 1
+            view['wall_s'] += sample['wall_s']
+            view['cpu_s'] += sample['cpu_s']
+            view['wall_max_s'] = max(view['wall_max_s'], sample['wall_s'])
+            view['alloc_peak_bytes'] = sample['alloc_peak_bytes']
+            view['figure_bytes'] += sample['figure_bytes']
+            for i, bound in enumerate(RENDER_TIME_BUCKETS):
+                if sample['wall_s'] <= bound:
+                    view['buckets'][i] += 1
+            self.recent.append(sample)
+    
+    def summary(self):
+        """Tableau de synthèse par vue, trié par temps total décroissant"""
+        with self._lock:
+            rows = [{
+                'Vue': name,
+                'Rendus': view['count'],
+                'Temps moyen (ms)': view['wall_s'] / view['count'] * 1000,
+                'Temps max (ms)': view['wall_max_s'] * 1000,
+                'CPU moyen (ms)': view['cpu_s'] / view['count'] * 1000,
+                'Pic alloc. (Ko)': view['alloc_peak_bytes'] / 1024,
+                'Figures (Ko/rendu)': view['figure_bytes'] / view['count'] / 1024,
+                '_total': view['wall_s'],
+            } for name, view in self._views.items()]
+        rows.sort(key=lambda row: row.pop('_total'), reverse=True)
+        return pd.DataFrame(rows)
+    
+    def prometheus(self, figure_cache=None):
+        """Export au format texte Prometheus"""
+        lines = [
+            '# TYPE budget_view_renders_total counter',
+            '# TYPE budget_view_wall_seconds histogram',
+            '# TYPE budget_view_cpu_seconds_total counter',
+            '# TYPE budget_view_wall_seconds_max gauge',
+            '# TYPE budget_view_alloc_peak_bytes gauge',
+            '# TYPE budget_view_figure_bytes_total counter',
+        ]
+        with self._lock:
+            for name, view in sorted(self._views.items()):
+                label = f'view="{name}"'
+                lines.append(f'budget_view_renders_total{{{label}}} {view["count"]}')
+                for bound, count in zip(RENDER_TIME_BUCKETS, view['buckets']):
+                    lines.append(f'budget_view_wall_seconds_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'budget_view_wall_seconds_bucket{{{label},le="+Inf"}} {view["count"]}')
+                lines.append(f'budget_view_wall_seconds_sum{{{label}}} {view["wall_s"]:.6f}')
+                lines.append(f'budget_view_wall_seconds_count{{{label}}} {view["count"]}')
+                lines.append(f'budget_view_cpu_seconds_total{{{label}}} {view["cpu_s"]:.6f}')
+                lines.append(f'budget_view_wall_seconds_max{{{label}}} {view["wall_max_s"]:.6f}')
+                lines.append(f'budget_view_alloc_peak_bytes{{{label}}} {view["alloc_peak_bytes"]}')
+                lines.append(f'budget_view_figure_bytes_total{{{label}}} {view["figure_bytes"]}')
+        if figure_cache is not None:
+            stats = figure_cache.stats()
+            lines += [
+                '# TYPE budget_figure_cache_entries gauge',
+                f'budget_figure_cache_entries {stats["entries"]}',
+                '# TYPE budget_figure_cache_bytes gauge',
+                f'budget_figure_cache_bytes {stats["bytes"]}',
+                '# TYPE budget_figure_cache_hits_total counter',
+                f'budget_figure_cache_hits_total {stats["hits"]}',
+                '# TYPE budget_figure_cache_misses_total counter',
+                f'budget_figure_cache_misses_total {stats["misses"]}',
+                '# TYPE budget_figure_cache_disk_hits_total counter',
+                f'budget_figure_cache_disk_hits_total {stats["disk_hits"]}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+
+@st.cache_resource(show_spinner=False)
+def get_view_metrics():
+    """Registre de mesures unique par processus
+    
+    BUDGET_PROFILE_MEMORY=1 active tracemalloc (allocations par vue),
+    BUDGET_METRICS_LOG=1 écrit chaque mesure en JSON sur la sortie d'erreur.
+    """
+    if os.environ.get('BUDGET_PROFILE_MEMORY') == '1' and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if os.environ.get('BUDGET_METRICS_LOG') == '1' and not metrics_logger.handlers:
+        metrics_logger.addHandler(logging.StreamHandler())
+        metrics_logger.setLevel(logging.INFO)
+    return ViewMetrics()
+
+
+# Mesures en cours dans le thread (un thread par session Streamlit)
+_active_measurements = threading.local()
+
+
+@contextmanager
+def instrument(view):
+    """Mesure un bloc de rendu : temps réel, temps CPU du thread, pic d'allocations, poids des figures"""
+    metrics = get_view_metrics()
+    stack = _active_measurements.__dict__.setdefault('stack', [])
+    sample = {'view': view, 'figure_bytes': 0}
+    stack.append(sample)
+    tracing = tracemalloc.is_tracing()
+    if tracing and len(stack) == 1:
+        tracemalloc.reset_peak()
+    alloc_start = tracemalloc.get_traced_memory()[0] if tracing else 0
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        yield sample
+    finally:
+        sample['wall_s'] = time.perf_counter() - wall_start
+        sample['cpu_s'] = time.thread_time() - cpu_start
+        sample['alloc_peak_bytes'] = (
+            max(tracemalloc.get_traced_memory()[1] - alloc_start, 0) if tracing else 0
+        )
+        stack.pop()
+        metrics.record(sample)
+        metrics_logger.info(json.dumps(sample, ensure_ascii=False))
+
+
+def record_figure_bytes(size):
+    """Ajoute le poids d'une figure envoyée au navigateur aux mesures en cours"""
+    for sample in getattr(_active_measurements, 'stack', ()):
+        sample['figure_bytes'] += size
+
+
+def instrumented(method):
+    """Décorateur : mesure chaque appel de la méthode sous son nom"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with instrument(method.__name__):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port, host='127.0.0.1'):
+    """Expose /metrics (format Prometheus) sur le port donné, une fois par processus
+    
+    Écoute en local par défaut ; BUDGET_METRICS_HOST (0.0.0.0...) l'expose
+    explicitement au réseau. Si le port est déjà pris, l'erreur est
+    journalisée une fois et le dashboard fonctionne sans endpoint (None).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    metrics, figure_cache = get_view_metrics(), get_figure_cache()
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.prometheus(figure_cache).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    try:
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+    except OSError as exc:
+        metrics_logger.warning("Endpoint /metrics indisponible sur %s:%d : %s", host, port, exc)
+        return None
+    threading.Thread(target=server.serve_forever, name='budget-metrics', daemon=True).start()
+    return server
+
+
+def setup_page():
+    """Configure la page Streamlit (appelé au lancement, pas à l'import du module)"""
+    # Configuration de la page
+    st.set_page_config(
+        page_title="Analyse Budget Français & LOLF",
+        page_icon="🇫🇷",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    
+    # CSS personnalisé
+    st.markdown("""
+    <style>
+        .main-header {
+            font-size: 2.5rem;
+            color: #1f77b4;
+            text-align: center;
+            margin-bottom: 2rem;
+        }
+        .metric-card {
+            background-color: #f0f2f6;
+            padding: 1rem;
+            border-radius: 10px;
+            border-left: 4px solid #1f77b4;
+        }
+        .section-header {
+            color: #1f77b4;
+            border-bottom: 2px solid #1f77b4;
+            padding-bottom: 0.5rem;
+            margin-top: 2rem;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+
+class BudgetDashboard:
+    def __init__(self, columns=None):
+        self.dataset = load_budget_dataset(columns)
+        self.data_version = self.dataset.version
+        self.df = self.load_data()
+        
+    def load_data(self):
+        """Charge les données budgétaires"""
+        return self.dataset.view()
+    
+    def projected(self, columns):
+        """Copie du dashboard restreinte aux colonnes d'une vue, sur la même version des données"""
+        dashboard = copy.copy(self)
+        dashboard.dataset = self.dataset.project(columns)
+        dashboard.df = dashboard.load_data()
+        return dashboard
+
+    @instrumented
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
         st.markdown('<h1 class="main-header">🇫🇷 Dashboard Budget Français & Analyse LOLF</h1>', 
@@ -216,8 +2129,8 @@ class BudgetDashboard:
             """)
         
         # Métriques principales
-        last_year = self.df[self.df['year'] == 2025].iloc[0]
-        current_year = self.df[self.df['year'] == 2023].iloc[0]
+        last_year = self.dataset.row(2025)
+        current_year = self.dataset.row(2023)
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -256,12 +2169,20 @@ class BudgetDashboard:
                 delta=f"{last_year['dépenses'] - current_year['dépenses']:.0f} Md€"
             )
 
+    @instrumented
     def create_evolution_chart(self):
         """Crée le graphique d'évolution des principales variables"""
         st.markdown('<h3 class="section-header">📈 Évolution des Grands Équilibres Budgétaires</h3>', 
                    unsafe_allow_html=True)
         
-        fig = make_subplots(
+        self.plot_figure('evolution', self.figure_evolution)
+
+    def figure_evolution(self):
+        """Figure 2x2 d'évolution des grands équilibres budgétaires"""
+        # Deux sous-graphiques par ligne : une demi-largeur de points par série
+        max_points = CHART_WIDTH_PX // 2
+        
+        fig = plotly_subplots.make_subplots(
             rows=2, cols=2,
             subplot_titles=('Recettes et Dépenses (Md€)', 'Dette et Déficit (% PIB)', 
                           'Répartition des Recettes', 'Répartition des Dépenses'),
@@ -271,12 +2192,12 @@ class BudgetDashboard:
         
         # Graphique 1: Recettes et Dépenses
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['recettes'], 
+            line_trace(self.df['year'], self.df['recettes'], max_points,
                       name='Recettes', line=dict(color='green', width=3)),
             row=1, col=1
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['dépenses'], 
+            line_trace(self.df['year'], self.df['dépenses'], max_points,
                       name='Dépenses', line=dict(color='red', width=3)),
             row=1, col=1
         )
@@ -285,12 +2206,12 @@ class BudgetDashboard:
         
         # Graphique 2: Dette et Déficit
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['dette_pib_%'], 
+            line_trace(self.df['year'], self.df['dette_pib_%'], max_points,
                       name='Dette/PIB', line=dict(color='purple', width=3)),
             row=1, col=2
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['déficit_pib_%'], 
+            line_trace(self.df['year'], self.df['déficit_pib_%'], max_points,
                       name='Déficit/PIB', line=dict(color='orange', width=3)),
             row=1, col=2
         )
@@ -303,17 +2224,17 @@ class BudgetDashboard:
         # Graphique 3: Répartition Recettes
         autres_recettes = self.df['recettes'] - self.df['recettes_impôts'] - self.df['recettes_tva']
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['recettes_impôts'], 
+            line_trace(self.df['year'], self.df['recettes_impôts'], max_points,
                       name='Impôts directs', line=dict(width=2)),
             row=2, col=1
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['recettes_tva'], 
+            line_trace(self.df['year'], self.df['recettes_tva'], max_points,
                       name='TVA', line=dict(width=2)),
             row=2, col=1
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=autres_recettes, 
+            line_trace(self.df['year'], autres_recettes, max_points,
                       name='Autres recettes', line=dict(width=2)),
             row=2, col=1
         )
@@ -322,30 +2243,31 @@ class BudgetDashboard:
         # Graphique 4: Répartition Dépenses
         autres_dépenses = self.df['dépenses'] - self.df['dépenses_éducation'] - self.df['dépenses_santé'] - self.df['dépenses_défense']
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['dépenses_éducation'], 
+            line_trace(self.df['year'], self.df['dépenses_éducation'], max_points,
                       name='Éducation', line=dict(width=2)),
             row=2, col=2
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['dépenses_santé'], 
+            line_trace(self.df['year'], self.df['dépenses_santé'], max_points,
                       name='Santé', line=dict(width=2)),
             row=2, col=2
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=self.df['dépenses_défense'], 
+            line_trace(self.df['year'], self.df['dépenses_défense'], max_points,
                       name='Défense', line=dict(width=2)),
             row=2, col=2
         )
         fig.add_trace(
-            go.Scatter(x=self.df['year'], y=autres_dépenses, 
+            line_trace(self.df['year'], autres_dépenses, max_points,
                       name='Autres dépenses', line=dict(width=2)),
             row=2, col=2
         )
         fig.add_vline(x=2006, line_dash="dash", line_color="blue", row=2, col=2)
         
         fig.update_layout(height=600, showlegend=True, title_text="Évolution Budgétaire 2002-2025")
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
 
+    @instrumented
     def create_lolf_analysis(self):
         """Crée l'analyse spécifique LOLF"""
         st.markdown('<h3 class="section-header">📊 Analyse LOLF - Performance de Gestion</h3>', 
@@ -354,75 +2276,72 @@ class BudgetDashboard:
         col1, col2 = st.columns(2)
         
         with col1:
-            # Graphique des indicateurs LOLF
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=self.df['year'], y=self.df['taux_execution_recettes'],
-                name='Exécution Recettes', line=dict(color='green', width=3)
-            ))
-            fig.add_trace(go.Scatter(
-                x=self.df['year'], y=self.df['taux_execution_dépenses'],
-                name='Exécution Dépenses', line=dict(color='red', width=3)
-            ))
-            fig.add_trace(go.Scatter(
-                x=self.df['year'], y=self.df['score_gestion_lolf'],
-                name='Score Gestion LOLF', line=dict(color='purple', width=4)
-            ))
-            fig.add_hline(y=100, line_dash="dash", line_color="black", 
-                         annotation_text="Objectif 100%")
-            fig.add_vline(x=2006, line_dash="dash", line_color="blue", 
-                         annotation_text="LOLF 2006")
-            
-            fig.update_layout(
-                title="Indicateurs de Performance LOLF",
-                xaxis_title="Année",
-                yaxis_title="Valeurs",
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            self.plot_figure('lolf_indicators', self.figure_lolf_indicators)
         
         with col2:
-            # Comparaison pré/post LOLF
-            pre_lolf = self.df[self.df['year'] < 2006]
-            post_lolf = self.df[self.df['year'] >= 2006]
-            
-            categories = ['Déficit/PIB', 'Dette/PIB', 'Exécution Recettes', 'Score LOLF']
-            pre_values = [
-                pre_lolf['déficit_pib_%'].mean(),
-                pre_lolf['dette_pib_%'].mean(),
-                pre_lolf['taux_execution_recettes'].mean(),
-                pre_lolf['score_gestion_lolf'].mean()
-            ]
-            post_values = [
-                post_lolf['déficit_pib_%'].mean(),
-                post_lolf['dette_pib_%'].mean(),
-                post_lolf['taux_execution_recettes'].mean(),
-                post_lolf['score_gestion_lolf'].mean()
-            ]
-            
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                name='Avant LOLF',
-                x=categories,
-                y=pre_values,
-                marker_color='lightblue'
-            ))
-            fig.add_trace(go.Bar(
-                name='Après LOLF',
-                x=categories,
-                y=post_values,
-                marker_color='lightcoral'
-            ))
-            
-            fig.update_layout(
-                title="Comparaison Pré/Post LOLF (Moyennes)",
-                xaxis_title="Indicateurs",
-                yaxis_title="Valeurs",
-                barmode='group',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            self.plot_figure('lolf_comparison', self.figure_lolf_comparison)
+
+    def figure_lolf_indicators(self):
+        """Indicateurs de performance LOLF (taux d'exécution et score de gestion)"""
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=self.df['year'], y=self.df['taux_execution_recettes'],
+            name='Exécution Recettes', line=dict(color='green', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=self.df['year'], y=self.df['taux_execution_dépenses'],
+            name='Exécution Dépenses', line=dict(color='red', width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=self.df['year'], y=self.df['score_gestion_lolf'],
+            name='Score Gestion LOLF', line=dict(color='purple', width=4)
+        ))
+        fig.add_hline(y=100, line_dash="dash", line_color="black", 
+                     annotation_text="Objectif 100%")
+        fig.add_vline(x=2006, line_dash="dash", line_color="blue", 
+                     annotation_text="LOLF 2006")
+        
+        fig.update_layout(
+            title="Indicateurs de Performance LOLF",
+            xaxis_title="Année",
+            yaxis_title="Valeurs",
+            height=400
+        )
+        return fig
+
+    def figure_lolf_comparison(self):
+        """Comparaison des moyennes avant et après la LOLF"""
+        categories = ['Déficit/PIB', 'Dette/PIB', 'Exécution Recettes', 'Score LOLF']
+        means = self.dataset.cube().statistics(
+            ['déficit_pib_%', 'dette_pib_%', 'taux_execution_recettes', 'score_gestion_lolf']
+        )
+        pre_values = means.iloc[0].tolist()
+        post_values = means.iloc[-1].tolist()
+        
+        fig = go.Figure()
+        fig.add_trace(go.Bar(
+            name='Avant LOLF',
+            x=categories,
+            y=pre_values,
+            marker_color='lightblue'
+        ))
+        fig.add_trace(go.Bar(
+            name='Après LOLF',
+            x=categories,
+            y=post_values,
+            marker_color='lightcoral'
+        ))
+        
+        fig.update_layout(
+            title="Comparaison Pré/Post LOLF (Moyennes)",
+            xaxis_title="Indicateurs",
+            yaxis_title="Valeurs",
+            barmode='group',
+            height=400
+        )
+        return fig
 
+    @instrumented
     def create_sector_analysis(self):
         """Analyse par secteurs de dépenses"""
         st.markdown('<h3 class="section-header">🏛️ Analyse par Secteurs</h3>', 
@@ -434,132 +2353,239 @@ class BudgetDashboard:
             col1, col2 = st.columns(2)
             
             with col1:
-                # Dépenses en valeur absolue
-                fig = px.area(self.df, x='year', y=['dépenses_éducation', 'dépenses_santé', 'dépenses_défense'],
-                             title="Évolution des Dépenses par Secteur (Md€)",
-                             labels={'value': 'Milliards d€', 'year': 'Année', 'variable': 'Secteur'})
-                fig.add_vline(x=2006, line_dash="dash", line_color="blue", 
-                             annotation_text="LOLF 2006")
-                st.plotly_chart(fig, use_container_width=True)
+                self.plot_figure('sector_amounts', self.figure_sector_amounts)
             
             with col2:
-                # Dépenses en % du PIB
-                self.df['éducation_pib_%'] = self.df['dépenses_éducation'] / self.df['pib'] * 100
-                self.df['santé_pib_%'] = self.df['dépenses_santé'] / self.df['pib'] * 100
-                self.df['défense_pib_%'] = self.df['dépenses_défense'] / self.df['pib'] * 100
-                
-                fig = px.line(self.df, x='year', y=['éducation_pib_%', 'santé_pib_%', 'défense_pib_%'],
-                             title="Dépenses Sectorielles en % du PIB",
-                             labels={'value': 'Pourcentage du PIB', 'year': 'Année', 'variable': 'Secteur'})
-                fig.add_vline(x=2006, line_dash="dash", line_color="blue")
-                st.plotly_chart(fig, use_container_width=True)
+                self.plot_figure('sector_gdp_share', self.figure_sector_gdp_share)
         
         with tab2:
-            # Graphique en camembert pour une année sélectionnée
-            year = st.slider("Sélectionnez l'année", 2002, 2025, 2025, key="pie_year")
-            
-            year_data = self.df[self.df['year'] == year].iloc[0]
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Répartition des recettes
-                recettes_data = {
-                    'Impôts directs': year_data['recettes_impôts'],
-                    'TVA': year_data['recettes_tva'],
-                    'Autres recettes': year_data['recettes'] - year_data['recettes_impôts'] - year_data['recettes_tva']
-                }
-                
-                fig = px.pie(values=list(recettes_data.values()), 
-                            names=list(recettes_data.keys()),
-                            title=f"Répartition des Recettes {year}")
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                # Répartition des dépenses
-                dépenses_data = {
-                    'Éducation': year_data['dépenses_éducation'],
-                    'Santé': year_data['dépenses_santé'],
-                    'Défense': year_data['dépenses_défense'],
-                    'Autres dépenses': year_data['dépenses'] - year_data['dépenses_éducation'] - year_data['dépenses_santé'] - year_data['dépenses_défense']
-                }
-                
-                fig = px.pie(values=list(dépenses_data.values()), 
-                            names=list(dépenses_data.keys()),
-                            title=f"Répartition des Dépenses {year}")
-                st.plotly_chart(fig, use_container_width=True)
+            # Camemberts de toutes les années envoyés une fois : le curseur
+            # d'année est géré par Plotly dans le navigateur, sans rerun
+            self.plot_figure('sector_splits', self.figure_sector_splits)
         
         with tab3:
             # Analyse détaillée des missions
             st.subheader("Analyse des Missions LOLF")
             
-            missions_data = {
-                'Mission': ['Enseignement scolaire', 'Santé', 'Défense', 'Recherche', 'Sécurité'],
-                'Budget 2025 (Md€)': [119.4, 217.8, 48.7, 35.2, 28.5],
-                'Évolution 2020-2025': [12.8, -11.4, 7.6, 15.2, 9.3],
-                'Performance LOLF': [85, 78, 92, 88, 81]
-            }
-            
-            missions_df = pd.DataFrame(missions_data)
-            
-            col1, col2 = st.columns(2)
+            hierarchy = load_lolf_hierarchy()
+            if hierarchy is not None:
+                self.create_mission_drilldown(hierarchy)
+                return
             
-            with col1:
-                fig = px.bar(missions_df, x='Mission', y='Budget 2025 (Md€)',
-                            title="Budget par Mission en 2025",
-                            color='Performance LOLF',
-                            color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
-            
-            with col2:
-                fig = px.bar(missions_df, x='Mission', y='Évolution 2020-2025',
-                            title="Évolution des Budgets 2020-2025 (%)",
-                            color='Évolution 2020-2025',
-                            color_continuous_scale='RdYlGn')
-                st.plotly_chart(fig, use_container_width=True)
+            for column, (name, builder) in zip(st.columns(2), self.mission_figures().items()):
+                with column:
+                    self.plot_figure(name, builder)
+
+    def mission_figures(self, hierarchy=None):
+        """Builders de l'onglet « Focus Missions », partagés par la vue, l'export et le préchauffage
+        
+        Avec une arborescence LOLF : treemap et sunburst (paramètres year,
+        mission, version) ; sans : synthèse des principales missions.
+        """
+        if hierarchy is None:
+            return {'missions_budget': self.figure_missions_budget,
+                    'missions_evolution': self.figure_missions_evolution}
+        return {
+            name: lambda year, mission, version, trace_type=trace_type: self.figure_hierarchy(
+                hierarchy, year, mission, trace_type
+            )
+            for name, trace_type in (('missions_treemap', go.Treemap), ('missions_sunburst', go.Sunburst))
+        }
+
+    def create_mission_drilldown(self, hierarchy):
+        """Exploration de l'arborescence LOLF à partir des agrégats précalculés"""
+        col1, col2 = st.columns(2)
+        with col1:
+            year = st.selectbox("Exercice", hierarchy.years[::-1], key="hierarchy_year")
+        with col2:
+            missions = hierarchy.missions(year)
+            mission = st.selectbox("Mission", ["Toutes les missions", *missions.index],
+                                   key="hierarchy_mission")
+        mission = None if mission == "Toutes les missions" else mission
+        
+        for column, (name, builder) in zip(st.columns(2), self.mission_figures(hierarchy).items()):
+            with column:
+                self.plot_figure(name, builder, year=year, mission=mission, version=hierarchy.version)
+        
+        if mission is None:
+            table = missions.to_frame('Montant (Md€)')
+        else:
+            table = hierarchy.children(year, mission)
+        st.dataframe(table.round(2), use_container_width=True)
+
+    def figure_hierarchy(self, hierarchy, year, mission, trace_type):
+        """Treemap ou sunburst d'une année (ou d'une mission) à partir des nœuds matérialisés"""
+        nodes = hierarchy.nodes(year, mission)
+        fig = go.Figure(trace_type(
+            ids=nodes['id'], parents=nodes['parent'], labels=nodes['label'], values=nodes['value'],
+            branchvalues='total', maxdepth=3,
+            hovertemplate="%{label}<br>%{value:.2f} Md€<extra></extra>"
+        ))
+        title = f"Budget {year}" + (f" - {mission}" if mission else " par mission")
+        fig.update_layout(title=title, height=500, margin=dict(t=50, l=0, r=0, b=0))
+        return fig
 
+    def figure_sector_amounts(self):
+        """Dépenses sectorielles en valeur absolue"""
+        fig = px.area(self.df, x='year', y=['dépenses_éducation', 'dépenses_santé', 'dépenses_défense'],
+                     title="Évolution des Dépenses par Secteur (Md€)",
+                     labels={'value': 'Milliards d€', 'year': 'Année', 'variable': 'Secteur'})
+        fig.add_vline(x=2006, line_dash="dash", line_color="blue", 
+                     annotation_text="LOLF 2006")
+        return fig
+
+    def figure_sector_gdp_share(self):
+        """Dépenses sectorielles en % du PIB (indicateurs précalculés du registre)"""
+        fig = px.line(self.df, x='year', y=['éducation_pib_%', 'santé_pib_%', 'défense_pib_%'],
+                     title="Dépenses Sectorielles en % du PIB",
+                     labels={'value': 'Pourcentage du PIB', 'year': 'Année', 'variable': 'Secteur'})
+        fig.add_vline(x=2006, line_dash="dash", line_color="blue")
+        return fig
+
+    def figure_sector_splits(self):
+        """Répartition des recettes et des dépenses, avec un curseur d'année côté navigateur"""
+        df = self.df
+        revenue = {
+            'Impôts directs': df['recettes_impôts'],
+            'TVA': df['recettes_tva'],
+            'Autres recettes': df['recettes'] - df['recettes_impôts'] - df['recettes_tva']
+        }
+        spending = {
+            'Éducation': df['dépenses_éducation'],
+            'Santé': df['dépenses_santé'],
+            'Défense': df['dépenses_défense'],
+            'Autres dépenses': df['dépenses'] - df['dépenses_éducation'] - df['dépenses_santé'] - df['dépenses_défense']
+        }
+        revenue_values = np.column_stack(list(revenue.values()))
+        spending_values = np.column_stack(list(spending.values()))
+        years = df['year'].tolist()
+        last = len(years) - 1
+        
+        def titles(year):
+            return [f"Répartition des Recettes {year}", f"Répartition des Dépenses {year}"]
+        
+        fig = plotly_subplots.make_subplots(rows=1, cols=2, specs=[[{'type': 'domain'}] * 2],
+                                            subplot_titles=titles(years[last]))
+        fig.add_trace(go.Pie(labels=list(revenue), values=revenue_values[last], sort=False), row=1, col=1)
+        fig.add_trace(go.Pie(labels=list(spending), values=spending_values[last], sort=False), row=1, col=2)
+        
+        # Une étape par année : les valeurs de toutes les années sont embarquées dans la figure
+        steps = [
+            dict(method='update', label=str(year), args=[
+                {'values': [revenue_values[i], spending_values[i]]},
+                {'annotations[0].text': titles(year)[0], 'annotations[1].text': titles(year)[1]}
+            ])
+            for i, year in enumerate(years)
+        ]
+        fig.update_layout(
+            height=500,
+            sliders=[dict(active=last, steps=steps, currentvalue=dict(prefix="Année : "), pad=dict(t=30))]
+        )
+        return fig
+
+    def missions_frame(self):
+        """Table de synthèse des principales missions LOLF"""
+        missions_data = {
+            'Mission': ['Enseignement scolaire', 'Santé', 'Défense', 'Recherche', 'Sécurité'],
+            'Budget 2025 (Md€)': [119.4, 217.8, 48.7, 35.2, 28.5],
+            'Évolution 2020-2025': [12.8, -11.4, 7.6, 15.2, 9.3],
+            'Performance LOLF': [85, 78, 92, 88, 81]
+        }
+        
+        return pd.DataFrame(missions_data)
+
+    def figure_missions_budget(self):
+        """Budget 2025 par mission"""
+        return px.bar(self.missions_frame(), x='Mission', y='Budget 2025 (Md€)',
+                      title="Budget par Mission en 2025",
+                      color='Performance LOLF',
+                      color_continuous_scale='Viridis')
+
+    def figure_missions_evolution(self):
+        """Évolution 2020-2025 des budgets par mission"""
+        return px.bar(self.missions_frame(), x='Mission', y='Évolution 2020-2025',
+                      title="Évolution des Budgets 2020-2025 (%)",
+                      color='Évolution 2020-2025',
+                      color_continuous_scale='RdYlGn')
+
+    @instrumented
     def create_interactive_comparison(self):
         """Crée des outils de comparaison interactive"""
         st.markdown('<h3 class="section-header">🔍 Analyse Comparative Interactive</h3>', 
                    unsafe_allow_html=True)
         
-        col1, col2 = st.columns(2)
+        col1, _ = st.columns(2)
         
         with col1:
             # Sélecteur d'indicateurs
             indicator = st.selectbox(
                 "Sélectionnez un indicateur",
-                ['recettes', 'dépenses', 'déficit', 'dette', 'pib', 
-                 'déficit_pib_%', 'dette_pib_%', 'score_gestion_lolf'],
-                format_func=lambda x: {
-                    'recettes': 'Recettes (Md€)',
-                    'dépenses': 'Dépenses (Md€)',
-                    'déficit': 'Déficit (Md€)',
-                    'dette': 'Dette (Md€)',
-                    'pib': 'PIB (Md€)',
-                    'déficit_pib_%': 'Déficit/PIB (%)',
-                    'dette_pib_%': 'Dette/PIB (%)',
-                    'score_gestion_lolf': 'Score LOLF'
-                }[x]
+                list(COMPARISON_INDICATORS),
+                format_func=COMPARISON_INDICATORS.get
             )
         
+        self.comparison_period(indicator)
+
+    @st.fragment
+    @instrumented
+    def comparison_period(self, indicator):
+        """Période d'analyse, graphique et statistiques : seul ce fragment est réexécuté quand le curseur bouge"""
+        year_range = st.slider(
+            "Période d'analyse",
+            *ANALYSIS_YEARS, ANALYSIS_YEARS
+        )
+        
+        # Le curseur fixe la période affichée par le graphique et celle des statistiques
+        self.plot_figure('comparison', self.figure_comparison,
+                         indicator=indicator, year_range=tuple(year_range))
+        
+        # Statistiques descriptives (requêtes en temps constant sur la période)
+        stats = self.dataset.range_stats(indicator)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Moyenne", f"{stats.mean(*year_range):.2f}")
         with col2:
-            # Sélecteur de période
-            year_range = st.slider(
-                "Période d'analyse",
-                2002, 2025, (2002, 2025)
-            )
+            st.metric("Minimum", f"{stats.min(*year_range):.2f}")
+        with col3:
+            st.metric("Maximum", f"{stats.max(*year_range):.2f}")
+        with col4:
+            first_value = self.dataset.value(indicator, year_range[0])
+            last_value = self.dataset.value(indicator, year_range[1])
+            evolution = (last_value - first_value) / first_value * 100
+            st.metric("Évolution", f"{evolution:.1f}%")
+
+    def figure_comparison(self, indicator, year_range):
+        """Évolution d'un indicateur sur la période choisie, avec ses seuils de référence
         
-        # Filtrage des données
-        filtered_df = self.df[
-            (self.df['year'] >= year_range[0]) & 
-            (self.df['year'] <= year_range[1])
-        ]
+        Une série courte est tracée en entière avec un range slider, l'axe
+        cadré sur la période : le zoom au-delà se fait dans le navigateur.
+        Une série longue est restreinte à la période avant sous-échantillonnage.
+        Sans période (`year_range=None`), toute la série est affichée.
+        """
+        full_series = year_range is None or len(self.df) <= CHART_WIDTH_PX
+        if full_series:
+            filtered_df = self.df
+        else:
+            filtered_df = self.df[
+                (self.df['year'] >= year_range[0]) & 
+                (self.df['year'] <= year_range[1])
+            ]
         
-        # Graphique interactif
-        fig = px.line(filtered_df, x='year', y=indicator,
-                     title=f"Évolution de {indicator} ({year_range[0]}-{year_range[1]})",
-                     markers=True)
+        # La série est sous-échantillonnée sur la seule période choisie :
+        # resserrer la période fait apparaître le détail fin
+        # (marqueurs conservés tant que la série reste courte)
+        mode = 'lines+markers' if len(filtered_df) <= 200 else 'lines'
+        fig = go.Figure(line_trace(filtered_df['year'], filtered_df[indicator], CHART_WIDTH_PX,
+                                   name=indicator, mode=mode))
+        if year_range is None:
+            fig.update_layout(title=f"Évolution de {indicator}")
+        else:
+            fig.update_layout(title=f"Évolution de {indicator} ({year_range[0]}-{year_range[1]})")
+        if full_series:
+            fig.update_layout(xaxis_rangeslider_visible=True)
+            if year_range is not None:
+                fig.update_xaxes(range=list(year_range))
+        fig.update_layout(xaxis_title='year', yaxis_title=indicator)
         
         # Ajout de lignes de référence pour certains indicateurs
         if indicator == 'déficit_pib_%':
@@ -574,72 +2600,57 @@ class BudgetDashboard:
         
         fig.add_vline(x=2006, line_dash="dash", line_color="blue", 
                      annotation_text="LOLF 2006")
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Statistiques descriptives
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Moyenne", f"{filtered_df[indicator].mean():.2f}")
-        with col2:
-            st.metric("Minimum", f"{filtered_df[indicator].min():.2f}")
-        with col3:
-            st.metric("Maximum", f"{filtered_df[indicator].max():.2f}")
-        with col4:
-            evolution = ((filtered_df[filtered_df['year'] == year_range[1]][indicator].values[0] - 
-                         filtered_df[filtered_df['year'] == year_range[0]][indicator].values[0]) / 
-                        filtered_df[filtered_df['year'] == year_range[0]][indicator].values[0] * 100)
-            st.metric("Évolution", f"{evolution:.1f}%")
+        return fig
 
-    def create_forecast_analysis(self):
-        """Analyse des projections et tendances"""
-        st.markdown('<h3 class="section-header">🔮 Projections et Tendances</h3>', 
-                   unsafe_allow_html=True)
-        
-        # Simulation de tendances
-        years_forecast = list(range(2026, 2031))
-        trend_data = []
+    def projection_frames(self):
+        """Calcule les projections 2026-2030 et les combine avec l'historique"""
+        # Simulation de tendances (calcul vectorisé sur toutes les années projetées)
+        years_forecast = np.arange(2026, 2031)
+        steps = years_forecast - 2025
         
-        last_value = self.df[self.df['year'] == 2025].iloc[0]
+        last_value = self.dataset.row(2025)
         
-        for i, year in enumerate(years_forecast):
-            trend_data.append({
-                'year': year,
-                'recettes': last_value['recettes'] * (1.03 ** (i+1)),  # Croissance de 3%
-                'dépenses': last_value['dépenses'] * (1.02 ** (i+1)),  # Croissance de 2%
-                'déficit': last_value['déficit'] * (1.05 ** (i+1)),    # Amélioration de 5%
-                'pib': last_value['pib'] * (1.025 ** (i+1)),           # Croissance de 2.5%
-                'type': 'Projection'
-            })
-        
-        forecast_df = pd.DataFrame(trend_data)
+        forecast_df = pd.DataFrame({
+            'year': years_forecast,
+            'recettes': last_value['recettes'] * 1.03 ** steps,  # Croissance de 3%
+            'dépenses': last_value['dépenses'] * 1.02 ** steps,  # Croissance de 2%
+            'déficit': last_value['déficit'] * 1.05 ** steps,    # Amélioration de 5%
+            'pib': last_value['pib'] * 1.025 ** steps,           # Croissance de 2.5%
+            'type': 'Projection'
+        })
         forecast_df['déficit_pib_%'] = forecast_df['déficit'] / forecast_df['pib'] * 100
-        forecast_df['dette_pib_%'] = forecast_df['déficit_pib_%'].cumsum() + last_value['dette_pib_%']
+        # Dette/PIB : dynamique stock-flux D_t = D_{t-1} - solde_t, effet de la croissance
+        # nominale (g = 2,5 %) ; le solde projeté est le solde total, intérêts compris : r = 0
+        forecast_df['dette_pib_%'] = debt_dynamics(
+            last_value['dette_pib_%'],
+            forecast_df['déficit_pib_%'].to_numpy(),
+            0.0,
+            0.025
+        )
         
         # Combinaison avec données historiques
         historical_df = self.df[['year', 'recettes', 'dépenses', 'déficit', 'pib', 'déficit_pib_%', 'dette_pib_%']].copy()
         historical_df['type'] = 'Historique'
         
         combined_df = pd.concat([historical_df, forecast_df], ignore_index=True)
+        return forecast_df, combined_df
+
+    @instrumented
+    def create_forecast_analysis(self):
+        """Analyse des projections et tendances"""
+        st.markdown('<h3 class="section-header">🔮 Projections et Tendances</h3>', 
+                   unsafe_allow_html=True)
+        
+        forecast_df, combined_df = self.projection_frames()
         
         # Graphiques de projection
         col1, col2 = st.columns(2)
         
         with col1:
-            fig = px.line(combined_df, x='year', y=['recettes', 'dépenses'],
-                         color='type', title="Projection Recettes/Dépenses 2026-2030",
-                         labels={'value': 'Milliards d€', 'year': 'Année'})
-            st.plotly_chart(fig, use_container_width=True)
+            self.plot_figure('forecast_amounts', lambda: self.figure_forecast_amounts(combined_df))
         
         with col2:
-            fig = px.line(combined_df, x='year', y=['déficit_pib_%', 'dette_pib_%'],
-                         color='type', title="Projection Déficit et Dette/PIB 2026-2030",
-                         labels={'value': 'Pourcentage du PIB', 'year': 'Année'})
-            fig.add_hline(y=3, line_dash="dash", line_color="red", 
-                         annotation_text="Seuil déficit 3%")
-            fig.add_hline(y=60, line_dash="dash", line_color="darkred", 
-                         annotation_text="Seuil dette 60%")
-            st.plotly_chart(fig, use_container_width=True)
+            self.plot_figure('forecast_ratios', lambda: self.figure_forecast_ratios(combined_df))
         
         # Tableau de projection
         st.subheader("Tableau de Projection 2026-2030")
@@ -648,6 +2659,229 @@ class BudgetDashboard:
         projection_display.columns = ['Année', 'Recettes (Md€)', 'Dépenses (Md€)', 'Déficit (Md€)', 'Déficit/PIB (%)', 'Dette/PIB (%)']
         
         st.dataframe(projection_display, use_container_width=True)
+        
+        self.create_scenario_analysis()
+
+    def create_scenario_analysis(self):
+        """Scénarios stochastiques : éventails de trajectoires et tables de percentiles"""
+        st.subheader("Scénarios Stochastiques (Monte Carlo)")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            horizon = st.slider("Horizon de projection (années)", *SCENARIO_HORIZONS, DEFAULT_SCENARIO_HORIZON,
+                                key="scenario_horizon")
+        with col2:
+            n_paths = st.select_slider(
+                "Nombre de trajectoires",
+                list(SCENARIO_PATH_OPTIONS),
+                value=DEFAULT_SCENARIO_PATHS,
+                key="scenario_paths"
+            )
+        
+        summary = self.scenario_summary(horizon, n_paths)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            self.plot_figure('scenario_debt', self.figure_scenario_debt, horizon=horizon, n_paths=n_paths)
+        with col2:
+            self.plot_figure('scenario_deficit', self.figure_scenario_deficit,
+                             horizon=horizon, n_paths=n_paths)
+        
+        percentiles_display = pd.concat(
+            {'Dette/PIB (%)': summary['dette_pib_%'], 'Déficit/PIB (%)': summary['déficit_pib_%']},
+            axis=1
+        ).round(1)
+        percentiles_display.index.name = 'Année'
+        st.dataframe(percentiles_display, use_container_width=True)
+        
+        self.create_debt_sweep(horizon)
+
+    def scenario_summary(self, horizon, n_paths):
+        """Percentiles des scénarios stochastiques partant de la dernière année observée"""
+        last_value = self.dataset.row(2025)
+        start = {key: float(last_value[key]) for key in ('recettes', 'dépenses', 'dette', 'pib')}
+        return run_scenarios(self.data_version, start, 2026, horizon, n_paths)
+
+    def figure_scenario_debt(self, horizon, n_paths):
+        """Éventail des trajectoires de dette/PIB"""
+        return self.figure_fan_chart(
+            self.scenario_summary(horizon, n_paths)['dette_pib_%'], 'dette_pib_%',
+            f"Dette/PIB : éventail de {n_paths:,} trajectoires", threshold=60
+        )
+
+    def figure_scenario_deficit(self, horizon, n_paths):
+        """Éventail des trajectoires de déficit/PIB"""
+        return self.figure_fan_chart(
+            self.scenario_summary(horizon, n_paths)['déficit_pib_%'], 'déficit_pib_%',
+            f"Déficit/PIB : éventail de {n_paths:,} trajectoires", threshold=-3
+        )
+
+    def default_primary_balance(self):
+        """Solde primaire initial du balayage r − g : celui de la dernière année observée"""
+        return round(float(self.dataset.value('déficit_pib_%', 2025)), 1)
+
+    def create_debt_sweep(self, horizon):
+        """Balayage croissance × taux d'intérêt de la dynamique de la dette"""
+        st.subheader("Dynamique de la Dette (r − g)")
+        
+        primary_balance = st.slider(
+            "Solde primaire maintenu (% du PIB)",
+            PRIMARY_BALANCE_RANGE[0], PRIMARY_BALANCE_RANGE[1], self.default_primary_balance(),
+            PRIMARY_BALANCE_RANGE[2],
+            key="sweep_primary_balance"
+        )
+        
+        self.plot_figure('debt_sweep', self.figure_debt_sweep,
+                         horizon=horizon, primary_balance=primary_balance)
+
+    def figure_debt_sweep(self, horizon, primary_balance):
+        """Carte de chaleur du ratio de dette final selon la croissance nominale et le taux d'intérêt"""
+        growth_grid = np.round(np.arange(-0.01, 0.0501, 0.0025), 4)
+        rate_grid = np.round(np.arange(0.0, 0.0601, 0.0025), 4)
+        initial_ratio = self.dataset.value('dette_pib_%', 2025)
+        final_ratio = debt_sweep(initial_ratio, primary_balance, growth_grid, rate_grid, horizon)
+        
+        fig = go.Figure(go.Heatmap(
+            x=growth_grid * 100, y=rate_grid * 100, z=final_ratio,
+            colorscale='RdYlGn_r', zmid=60,
+            colorbar=dict(title='Dette/PIB (%)'),
+            hovertemplate="g = %{x:.2f}%<br>r = %{y:.2f}%<br>Dette/PIB = %{z:.1f}%<extra></extra>"
+        ))
+        fig.update_layout(
+            title=f"Dette/PIB en {2025 + horizon} ({len(rate_grid) * len(growth_grid)} scénarios, "
+                  f"solde primaire {primary_balance:+.1f}% du PIB)",
+            xaxis_title="Croissance nominale g (%)",
+            yaxis_title="Taux d'intérêt apparent r (%)",
+            height=500
+        )
+        return fig
+
+    def figure_fan_chart(self, summary, column, title, threshold=None):
+        """Éventail des percentiles d'une variable projetée, prolongeant l'historique"""
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            x=self.df['year'], y=self.df[column],
+            name='Historique', line=dict(color='black', width=3)
+        ))
+        
+        years = summary.index
+        for low, high, opacity in (('p5', 'p95', 0.2), ('p25', 'p75', 0.4)):
+            fig.add_trace(go.Scatter(
+                x=years, y=summary[high], line=dict(width=0),
+                showlegend=False, hoverinfo='skip'
+            ))
+            fig.add_trace(go.Scatter(
+                x=years, y=summary[low], fill='tonexty', line=dict(width=0),
+                fillcolor=f'rgba(31, 119, 180, {opacity})',
+                name=f"Percentiles {low[1:]}-{high[1:]}"
+            ))
+        fig.add_trace(go.Scatter(
+            x=years, y=summary['p50'], name='Médiane', line=dict(color='#1f77b4', width=3)
+        ))
+        
+        if threshold is not None:
+            fig.add_hline(y=threshold, line_dash="dash", line_color="red", 
+                         annotation_text=f"Seuil {abs(threshold)}%")
+        
+        fig.update_layout(
+            title=title,
+            xaxis_title="Année",
+            yaxis_title="Pourcentage du PIB",
+            height=400
+        )
+        return fig
+
+    def figure_forecast_amounts(self, combined_df):
+        """Projection des recettes et dépenses"""
+        return px.line(combined_df, x='year', y=['recettes', 'dépenses'],
+                       color='type', title="Projection Recettes/Dépenses 2026-2030",
+                       labels={'value': 'Milliards d€', 'year': 'Année'})
+
+    def figure_forecast_ratios(self, combined_df):
+        """Projection du déficit et de la dette en % du PIB"""
+        fig = px.line(combined_df, x='year', y=['déficit_pib_%', 'dette_pib_%'],
+                     color='type', title="Projection Déficit et Dette/PIB 2026-2030",
+                     labels={'value': 'Pourcentage du PIB', 'year': 'Année'})
+        fig.add_hline(y=3, line_dash="dash", line_color="red", 
+                     annotation_text="Seuil déficit 3%")
+        fig.add_hline(y=60, line_dash="dash", line_color="darkred", 
+                     annotation_text="Seuil dette 60%")
+        return fig
+
+    def figure_spec(self, name, builder, **params):
+        """Spécification JSON et objet Figure via le cache partagé, indexé par (vue, paramètres, version des données)
+        
+        La figure d'une entrée en mémoire est reprise telle quelle ; une
+        spécification lue sur disque n'est décodée qu'une fois par processus.
+        """
+        cache = get_figure_cache()
+        key = (name, tuple(sorted(params.items())), self.data_version)
+        spec = cache.get(key)
+        if spec is None:
+            fig = builder(**params)
+            spec = fig.to_json()
+            cache.put(key, spec, fig)
+            return spec, fig
+        
+        fig = cache.figure(key)
+        if fig is None:
+            # La spécification provient d'une figure déjà validée : inutile de la revalider
+            fig = go.Figure(json.loads(spec), _validate=False)
+            cache.attach(key, fig)
+        return spec, fig
+
+    def plot_figure(self, name, builder, **params):
+        """Affiche une figure via le cache partagé
+        
+        st.plotly_chart ne revalide pas un objet Figure (il le ferait d'un
+        dict) : la figure en cache lui est passée directement.
+        """
+        spec, fig = self.figure_spec(name, builder, **params)
+        record_figure_bytes(len(spec))
+        st.plotly_chart(fig, use_container_width=True)
+
+    def create_debug_panel(self):
+        """Panneau d'instrumentation (sidebar), affiché avec BUDGET_DEBUG=1 ou ?debug=1"""
+        if os.environ.get('BUDGET_DEBUG') != '1' and st.query_params.get('debug') != '1':
+            return
+        
+        metrics = get_view_metrics()
+        with st.sidebar.expander("🛠️ Instrumentation", expanded=True):
+            summary = metrics.summary()
+            if summary.empty:
+                st.caption("Aucune mesure pour l'instant")
+            else:
+                st.dataframe(summary.round(1), use_container_width=True, hide_index=True)
+            
+            cache_stats = get_figure_cache().stats()
+            found = cache_stats['hits'] + cache_stats['disk_hits']
+            requests = found + cache_stats['misses']
+            st.caption(
+                f"Cache de figures : {cache_stats['entries']} entrées, "
+                f"{cache_stats['bytes'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.0f} Mo, "
+                f"taux de succès {found / requests if requests else 0:.0%}"
+            )
+            disk = get_disk_cache()
+            if disk is not None:
+                disk_stats = disk.stats()
+                st.caption(
+                    f"Cache disque : {disk_stats['entries']} entrées, "
+                    f"{disk_stats['bytes'] / 1024 / 1024:.1f}/{disk_stats['max_bytes'] / 1024 / 1024:.0f} Mo, "
+                    f"{disk_stats['hits']} lectures réussies"
+                )
+            total = schema_report(self.df).iloc[-1]
+            st.caption(
+                f"Jeu de données : {total['octets'] / 1024:.0f} Ko en types compacts, "
+                f"{total['gain_%']:.0f} % de moins qu'en float64/object"
+            )
+            if not tracemalloc.is_tracing():
+                st.caption("Allocations non mesurées (BUDGET_PROFILE_MEMORY=1 pour activer tracemalloc)")
+            st.download_button(
+                "Exporter (format Prometheus)",
+                metrics.prometheus(get_figure_cache()),
+                file_name="metrics.txt",
+                mime="text/plain"
+            )
 
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
@@ -663,7 +2897,7 @@ class BudgetDashboard:
         st.sidebar.markdown("### 📅 Filtre temporel")
         year_range = st.sidebar.slider(
             "Période d'analyse",
-            2002, 2025, (2002, 2025)
+            *ANALYSIS_YEARS, ANALYSIS_YEARS
         )
         
         # Sélecteur d'indicateurs principaux
@@ -685,96 +2919,224 @@ class BudgetDashboard:
         st.sidebar.markdown("### ⚙️ Options")
         show_annotations = st.sidebar.checkbox("Afficher les annotations LOLF", value=True)
         show_thresholds = st.sidebar.checkbox("Afficher les seuils UE", value=True)
+        render_all_tabs = st.sidebar.checkbox(
+            "Charger tous les onglets",
+            value=False,
+            help="Calcule toutes les vues à chaque interaction au lieu de la seule vue sélectionnée"
+        )
         
         return {
             'view': analysis_view,
             'year_range': year_range,
             'main_indicators': main_indicators,
             'show_annotations': show_annotations,
-            'show_thresholds': show_thresholds
+            'show_thresholds': show_thresholds,
+            'render_all_tabs': render_all_tabs
         }
 
+    def render_overview(self, controls):
+        """Vue d'ensemble : évolution générale et indicateurs clés sélectionnés"""
+        self.create_evolution_chart()
+        
+        # Métriques supplémentaires
+        st.markdown("### 📈 Indicateurs Clés Sélectionnés")
+        cols = st.columns(len(controls['main_indicators']))
+        for i, indicator in enumerate(controls['main_indicators']):
+            with cols[i]:
+                current_val = self.dataset.value(indicator, 2025)
+                previous_val = self.dataset.value(indicator, 2024)
+                delta = current_val - previous_val
+                
+                indicator_names = {
+                    'déficit_pib_%': 'Déficit/PIB',
+                    'dette_pib_%': 'Dette/PIB',
+                    'score_gestion_lolf': 'Score LOLF',
+                    'recettes_pib_%': 'Recettes/PIB',
+                    'dépenses_pib_%': 'Dépenses/PIB'
+                }
+                
+                st.metric(
+                    label=indicator_names[indicator],
+                    value=f"{current_val:.1f}%" if 'pib_%' in indicator else f"{current_val:.0f}",
+                    delta=f"{delta:+.1f}" if 'pib_%' in indicator else f"{delta:+.0f}"
+                )
+
+    def render_lolf(self, controls):
+        """Vue LOLF : indicateurs de performance et impact détaillé de la réforme"""
+        self.create_lolf_analysis()
+        
+        # Analyse d'impact LOLF détaillée
+        st.markdown("### 📋 Impact Détaillé de la LOLF")
+        cube = self.dataset.cube()
+        means = cube.statistics(['score_gestion_lolf', 'taux_execution_recettes', 'déficit_pib_%'])
+        pre, post = means.iloc[0], means.iloc[-1]
+        change = post - pre
+        
+        impact_data = {
+            'Période': [f"Avant LOLF ({cube.label(cube.periods[0])})",
+                        f"Après LOLF ({cube.label(cube.periods[-1])})", 'Évolution'],
+            'Score Gestion': [
+                pre['score_gestion_lolf'],
+                post['score_gestion_lolf'],
+                f"+{change['score_gestion_lolf']:.1f} points"
+            ],
+            'Exécution Recettes': [
+                f"{pre['taux_execution_recettes']:.1f}%",
+                f"{post['taux_execution_recettes']:.1f}%",
+                f"+{change['taux_execution_recettes']:.1f}%"
+            ],
+            'Déficit/PIB': [
+                f"{pre['déficit_pib_%']:.1f}%",
+                f"{post['déficit_pib_%']:.1f}%",
+                f"{change['déficit_pib_%']:+.1f}%"
+            ]
+        }
+        
+        impact_df = pd.DataFrame(impact_data)
+        st.dataframe(impact_df, use_container_width=True)
+
+    def snapshot_figures(self):
+        """Figures de chaque vue dans leur état initial, pour l'export statique
+        
+        Retourne {vue: {nom: (builder, paramètres)}} avec les mêmes builders
+        et paramètres que plot_figure : un export et une session live
+        produisent des figures identiques.
+        """
+        combined_df = lambda: self.projection_frames()[1]
+        scenario = dict(horizon=DEFAULT_SCENARIO_HORIZON, n_paths=DEFAULT_SCENARIO_PATHS)
+        # Focus Missions : l'arborescence LOLF si elle est configurée, sur l'exercice le plus
+        # récent et toutes les missions (sélection initiale de la vue)
+        hierarchy = load_lolf_hierarchy()
+        missions = ({} if hierarchy is None
+                    else dict(year=hierarchy.years[-1], mission=None, version=hierarchy.version))
+        return {
+            "Vue d'ensemble": {
+                'evolution': (self.figure_evolution, {}),
+            },
+            "Analyse LOLF": {
+                'lolf_indicators': (self.figure_lolf_indicators, {}),
+                'lolf_comparison': (self.figure_lolf_comparison, {}),
+            },
+            "Analyse sectorielle": {
+                'sector_amounts': (self.figure_sector_amounts, {}),
+                'sector_gdp_share': (self.figure_sector_gdp_share, {}),
+                'sector_splits': (self.figure_sector_splits, {}),
+                **{name: (builder, missions) for name, builder in self.mission_figures(hierarchy).items()},
+            },
+            "Comparaisons": {
+                f"comparison_{indicator}": (self.figure_comparison, dict(indicator=indicator, year_range=None))
+                for indicator in COMPARISON_INDICATORS
+            },
+            "Projections": {
+                'forecast_amounts': (lambda: self.figure_forecast_amounts(combined_df()), {}),
+                'forecast_ratios': (lambda: self.figure_forecast_ratios(combined_df()), {}),
+                'scenario_debt': (self.figure_scenario_debt, scenario),
+                'scenario_deficit': (self.figure_scenario_deficit, scenario),
+                'debt_sweep': (self.figure_debt_sweep, dict(horizon=DEFAULT_SCENARIO_HORIZON,
+                                                            primary_balance=self.default_primary_balance())),
+            },
+        }
+
+    def figure_parameter_space(self):
+        """Toutes les combinaisons de paramètres que les contrôles des vues peuvent demander
+        
+        Retourne {nom: (builder, [paramètres, ...])} avec les mêmes noms et
+        paramètres que plot_figure, pour précalculer le cache : chaque
+        position des curseurs et chaque choix des sélecteurs. Les contrôles
+        sans figure (indicateurs clés de la sidebar, statistiques de
+        période en temps constant) n'y figurent pas.
+        """
+        combined_df = lambda: self.projection_frames()[1]
+        space = {
+            'evolution': (self.figure_evolution, [{}]),
+            'lolf_indicators': (self.figure_lolf_indicators, [{}]),
+            'lolf_comparison': (self.figure_lolf_comparison, [{}]),
+            'sector_amounts': (self.figure_sector_amounts, [{}]),
+            'sector_gdp_share': (self.figure_sector_gdp_share, [{}]),
+            'sector_splits': (self.figure_sector_splits, [{}]),
+            'forecast_amounts': (lambda: self.figure_forecast_amounts(combined_df()), [{}]),
+            'forecast_ratios': (lambda: self.figure_forecast_ratios(combined_df()), [{}]),
+        }
+        
+        hierarchy = load_lolf_hierarchy()
+        if hierarchy is None:
+            combos = [{}]
+        else:
+            combos = [dict(year=year, mission=mission, version=hierarchy.version)
+                      for year in hierarchy.years
+                      for mission in [None, *hierarchy.missions(year).index]]
+        for name, builder in self.mission_figures(hierarchy).items():
+            space[name] = (builder, combos)
+        
+        # Comparaisons : une figure par période que le curseur peut sélectionner
+        first, last = ANALYSIS_YEARS
+        ranges = [(start, end) for start in range(first, last + 1) for end in range(start, last + 1)]
+        space['comparison'] = (self.figure_comparison, [dict(indicator=indicator, year_range=year_range)
+                                                        for indicator in COMPARISON_INDICATORS
+                                                        for year_range in ranges])
+        
+        horizons = range(SCENARIO_HORIZONS[0], SCENARIO_HORIZONS[1] + 1)
+        scenarios = [dict(horizon=horizon, n_paths=n_paths)
+                     for horizon in horizons for n_paths in SCENARIO_PATH_OPTIONS]
+        space['scenario_debt'] = (self.figure_scenario_debt, scenarios)
+        space['scenario_deficit'] = (self.figure_scenario_deficit, scenarios)
+        
+        low, high, step = PRIMARY_BALANCE_RANGE
+        balances = [round(low + i * step, 1) for i in range(round((high - low) / step) + 1)]
+        space['debt_sweep'] = (self.figure_debt_sweep, [dict(horizon=horizon, primary_balance=balance)
+                                                        for horizon in horizons for balance in balances])
+        return space
+
+    def view_renderers(self):
+        """Associe chaque mode d'analyse de la sidebar à son onglet, ses colonnes et sa fonction de rendu
+        
+        La fonction reçoit le dashboard restreint aux colonnes de la vue
+        (VIEW_COLUMNS) et les contrôles de la sidebar.
+        """
+        return {
+            "Vue d'ensemble": ("📊 Vue d'ensemble", VIEW_COLUMNS["Vue d'ensemble"],
+                               BudgetDashboard.render_overview),
+            "Analyse LOLF": ("🎯 Analyse LOLF", VIEW_COLUMNS["Analyse LOLF"], BudgetDashboard.render_lolf),
+            "Analyse sectorielle": ("🏛️ Secteurs", VIEW_COLUMNS["Analyse sectorielle"],
+                                    lambda dashboard, controls: dashboard.create_sector_analysis()),
+            "Comparaisons": ("🔍 Comparaisons", VIEW_COLUMNS["Comparaisons"],
+                             lambda dashboard, controls: dashboard.create_interactive_comparison()),
+            "Projections": ("🔮 Projections", VIEW_COLUMNS["Projections"],
+                            lambda dashboard, controls: dashboard.create_forecast_analysis()),
+        }
+
+    @instrumented
     def run_dashboard(self):
         """Exécute le dashboard complet"""
+        # Données rafraîchies depuis le rerun précédent de cette session
+        previous_version = st.session_state.get('data_version')
+        if previous_version is not None and previous_version != self.data_version:
+            st.toast("🔄 Données budgétaires mises à jour")
+        st.session_state['data_version'] = self.data_version
+        
         # Sidebar
         controls = self.create_sidebar()
         
         # Header
         self.display_header()
         
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "📊 Vue d'ensemble", 
-            "🎯 Analyse LOLF", 
-            "🏛️ Secteurs", 
-            "🔍 Comparaisons", 
-            "🔮 Projections"
-        ])
-        
-        with tab1:
-            self.create_evolution_chart()
-            
-            # Métriques supplémentaires
-            st.markdown("### 📈 Indicateurs Clés Sélectionnés")
-            cols = st.columns(len(controls['main_indicators']))
-            for i, indicator in enumerate(controls['main_indicators']):
-                with cols[i]:
-                    current_val = self.df[self.df['year'] == 2025][indicator].values[0]
-                    previous_val = self.df[self.df['year'] == 2024][indicator].values[0]
-                    delta = current_val - previous_val
-                    
-                    indicator_names = {
-                        'déficit_pib_%': 'Déficit/PIB',
-                        'dette_pib_%': 'Dette/PIB',
-                        'score_gestion_lolf': 'Score LOLF',
-                        'recettes_pib_%': 'Recettes/PIB',
-                        'dépenses_pib_%': 'Dépenses/PIB'
-                    }
-                    
-                    st.metric(
-                        label=indicator_names[indicator],
-                        value=f"{current_val:.1f}%" if 'pib_%' in indicator else f"{current_val:.0f}",
-                        delta=f"{delta:+.1f}" if 'pib_%' in indicator else f"{delta:+.0f}"
-                    )
-        
-        with tab2:
-            self.create_lolf_analysis()
-            
-            # Analyse d'impact LOLF détaillée
-            st.markdown("### 📋 Impact Détaillé de la LOLF")
-            pre_lolf = self.df[self.df['year'] < 2006]
-            post_lolf = self.df[self.df['year'] >= 2006]
-            
-            impact_data = {
-                'Période': ['Avant LOLF (2002-2005)', 'Après LOLF (2006-2025)', 'Évolution'],
-                'Score Gestion': [
-                    pre_lolf['score_gestion_lolf'].mean(),
-                    post_lolf['score_gestion_lolf'].mean(),
-                    f"+{(post_lolf['score_gestion_lolf'].mean() - pre_lolf['score_gestion_lolf'].mean()):.1f} points"
-                ],
-                'Exécution Recettes': [
-                    f"{pre_lolf['taux_execution_recettes'].mean():.1f}%",
-                    f"{post_lolf['taux_execution_recettes'].mean():.1f}%",
-                    f"+{(post_lolf['taux_execution_recettes'].mean() - pre_lolf['taux_execution_recettes'].mean()):.1f}%"
-                ],
-                'Déficit/PIB': [
-                    f"{pre_lolf['déficit_pib_%'].mean():.1f}%",
-                    f"{post_lolf['déficit_pib_%'].mean():.1f}%",
-                    f"{(post_lolf['déficit_pib_%'].mean() - pre_lolf['déficit_pib_%'].mean()):+.1f}%"
-                ]
-            }
-            
-            impact_df = pd.DataFrame(impact_data)
-            st.dataframe(impact_df, use_container_width=True)
-        
-        with tab3:
-            self.create_sector_analysis()
+        if os.environ.get('BUDGET_METRICS_PORT'):
+            start_metrics_server(int(os.environ['BUDGET_METRICS_PORT']),
+                                 os.environ.get('BUDGET_METRICS_HOST', '127.0.0.1'))
         
-        with tab4:
-            self.create_interactive_comparison()
+        renderers = self.view_renderers()
+        if controls['render_all_tabs']:
+            # Navigation par onglets : toutes les vues sont calculées à chaque rerun
+            tabs = st.tabs([label for label, _, _ in renderers.values()])
+            for tab, (_, columns, render) in zip(tabs, renderers.values()):
+                with tab:
+                    render(self.projected(columns), controls)
+        else:
+            # Rendu différé : seule la vue choisie dans la sidebar est calculée, sur ses seules colonnes
+            _, columns, render = renderers[controls['view']]
+            render(self.projected(columns), controls)
         
-        with tab5:
-            self.create_forecast_analysis()
+        self.create_debug_panel()
         
         # Footer
         st.markdown("---")
@@ -786,5 +3148,6 @@ class BudgetDashboard:
 
 # Lancement du dashboard
 if __name__ == "__main__":
+    setup_page()
     dashboard = BudgetDashboard()
     dashboard.run_dashboard()
\ No newline at end of file
@@ -0,0 +1,340 @@
+# benchmark.py
+"""Benchmark headless des vues du dashboard
+
+Chaque méthode create_* et chaque vue de run_dashboard est exécutée via
+l'AppTest de Streamlit sur des jeux de données synthétiques de taille
+croissante (24 années, de 1 à plusieurs milliers de lignes programme par
+année). Pour chaque cible on mesure le temps à froid (caches vidés), le
+temps à chaud, le pic mémoire des allocations Python (tracemalloc : les
+tampons Arrow n'y figurent pas) et le poids des figures Plotly envoyées au
+navigateur.
+
+    python benchmark.py                       # mesure et affiche
+    python benchmark.py --save-baseline       # enregistre la référence
+    python benchmark.py --compare             # échoue en cas de régression
+    python benchmark.py --startup             # coût d'import par module au démarrage
+    python benchmark.py --schema              # mémoire avec et sans types compacts
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import Dashboard
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dashboard.py')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# 24 années × 4 167 lignes ≈ 100 000 lignes programme
+DEFAULT_ROWS_PER_YEAR = (1, 100, 1000, 4167)
+
+METHODS = [
+    'display_header',
+    'create_evolution_chart',
+    'create_lolf_analysis',
+    'create_sector_analysis',
+    'create_interactive_comparison',
+    'create_forecast_analysis',
+]
+
+VIEWS = ["Vue d'ensemble", "Analyse LOLF", "Analyse sectorielle", "Comparaisons", "Projections"]
+
+# Tolérances de comparaison avec la référence
+TIME_TOLERANCE = 0.5        # +50 % de temps
+TIME_NOISE_FLOOR_S = 0.05   # écarts absolus ignorés en dessous de ce seuil
+MEMORY_TOLERANCE = 0.25
+PAYLOAD_TOLERANCE = 0.10
+
+# Charge de calibration : les temps de référence sont ramenés à la vitesse de la machine courante
+CALIBRATION_ROWS = 200_000
+
+# Budget de démarrage à froid d'un worker : import de Dashboard dans un processus neuf
+COLD_START_BUDGET_S = 1.5
+
+
+def synthetic_budget_frame(rows_per_year, seed=0):
+    """Jeu synthétique au grain programme, cohérent avec les totaux annuels de BUDGET_DATA
+
+    Les montants additifs de chaque année sont répartis entre `rows_per_year`
+    programmes ; la dette et le PIB sont répétés sur chaque ligne.
+    """
+    rng = np.random.default_rng(seed)
+    yearly = Dashboard.InlineSource(Dashboard.BUDGET_DATA).read()
+    additive = [c for c in yearly.columns
+                if c != 'year' and c not in Dashboard.NON_ADDITIVE_COLUMNS]
+
+    weights = rng.dirichlet(np.ones(rows_per_year), size=len(yearly)).ravel()
+    df = yearly.loc[yearly.index.repeat(rows_per_year)].reset_index(drop=True)
+    df[additive] = df[additive].mul(weights, axis=0)
+    programmes = np.tile(np.arange(rows_per_year), len(yearly))
+    df['mission'] = [f"M{p % 32:02d}" for p in programmes]
+    df['programme'] = [f"P{p:05d}" for p in programmes]
+    return df
+
+
+def write_dataset(df, directory):
+    """Écrit le jeu synthétique au format colonnaire si pyarrow est disponible, sinon en CSV"""
+    try:
+        path = os.path.join(directory, 'budget.parquet')
+        Dashboard.write_columnar(df, path)
+    except ImportError:
+        path = os.path.join(directory, 'budget.csv')
+        df.to_csv(path, index=False)
+    return path
+
+
+def _method_script(method):
+    import Dashboard
+    getattr(Dashboard.BudgetDashboard(), method)()
+
+
+def _clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def _method_app(method):
+    at = AppTest.from_function(_method_script, args=(method,), default_timeout=600)
+    return at, at.run
+
+
+def _view_app(view):
+    at = AppTest.from_file(APP_PATH, default_timeout=600)
+    at.run()
+    at.sidebar.selectbox[0].select(view)
+    return at, at.run
+
+
+def _timed(factory, cold, trace_memory=False):
+    if cold:
+        _clear_caches()
+    at, run = factory()
+    if cold:
+        _clear_caches()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    payload = sum(len(chart.proto.spec) for chart in at.get('plotly_chart'))
+    return elapsed, peak, payload
+
+
+def measure(factory, repeat):
+    """Temps à froid et à chaud (médianes), pic mémoire à froid et poids des figures"""
+    cold = [_timed(factory, cold=True)[0] for _ in range(repeat)]
+
+    # À chaud : les caches partagés sont remplis par un premier passage
+    _timed(factory, cold=False)
+    warm = [_timed(factory, cold=False)[0] for _ in range(repeat)]
+
+    _, peak, payload = _timed(factory, cold=True, trace_memory=True)
+    return {
+        'cold_s': round(statistics.median(cold), 4),
+        'warm_s': round(statistics.median(warm), 4),
+        'peak_mb': round(peak / 1024 / 1024, 2),
+        'payload_bytes': payload,
+    }
+
+
+def run_benchmarks(rows_per_year_list, repeat=3, targets=None):
+    """Exécute toutes les mesures ; retourne {"<lignes>/<cible>": mesures}"""
+    results = {}
+    previous_path = os.environ.get('BUDGET_DATA_PATH')
+    try:
+        for rows_per_year in rows_per_year_list:
+            with tempfile.TemporaryDirectory() as directory:
+                df = synthetic_budget_frame(rows_per_year)
+                os.environ['BUDGET_DATA_PATH'] = write_dataset(df, directory)
+
+                cases = [(method, lambda m=method: _method_app(m)) for method in METHODS]
+                cases += [(f"run_dashboard[{view}]", lambda v=view: _view_app(v)) for view in VIEWS]
+                for target, factory in cases:
+                    if targets and not any(t in target for t in targets):
+                        continue
+                    key = f"{len(df)}/{target}"
+                    results[key] = measure(factory, repeat)
+                    print(f"{key:<45} " + "  ".join(f"{k}={v}" for k, v in results[key].items()),
+                          flush=True)
+    finally:
+        if previous_path is None:
+            os.environ.pop('BUDGET_DATA_PATH', None)
+        else:
+            os.environ['BUDGET_DATA_PATH'] = previous_path
+    return results
+
+
+def profile_startup(repeat=3):
+    """Démarrage à froid : durée d'import de Dashboard et coût d'import par paquet
+
+    Chaque mesure lance un interpréteur neuf avec `-X importtime` ; le coût
+    propre de chaque module est regroupé par paquet de premier niveau.
+    """
+    code = "import time; t = time.perf_counter(); import Dashboard; print(time.perf_counter() - t)"
+    durations = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                              cwd=os.path.dirname(APP_PATH), capture_output=True, text=True, check=True)
+        durations.append(float(proc.stdout.strip().splitlines()[-1]))
+
+    packages = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    by_cost = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+    return statistics.median(durations), [(name, us / 1e6) for name, us in by_cost]
+
+
+def report_startup(top=15):
+    """Affiche le profil de démarrage ; retourne False si le budget est dépassé"""
+    elapsed, packages = profile_startup()
+    print(f"{'paquet':<30} {'import (s)':>10}")
+    for name, seconds in packages[:top]:
+        print(f"{name:<30} {seconds:>10.3f}")
+    within_budget = elapsed <= COLD_START_BUDGET_S
+    print(f"Import de Dashboard à froid : {elapsed:.3f} s "
+          f"(budget {COLD_START_BUDGET_S} s) {'OK' if within_budget else 'DÉPASSÉ'}")
+    return within_budget
+
+
+def report_schema(rows_per_year_list):
+    """Mémoire du jeu au grain programme avec et sans les types compacts (apply_budget_schema)"""
+    for rows_per_year in rows_per_year_list:
+        df = synthetic_budget_frame(rows_per_year)
+        report = Dashboard.schema_report(Dashboard.apply_budget_schema(df))
+        total = report.iloc[-1]
+        print(f"{len(df):>8} lignes : {total['octets_par_défaut'] / 1024 / 1024:8.2f} Mo -> "
+              f"{total['octets'] / 1024 / 1024:8.2f} Mo ({total['gain_%']:.0f} % de gain)")
+    report['octets'] = report['octets'].astype('int64')
+    report['octets_par_défaut'] = report['octets_par_défaut'].astype('int64')
+    print(report.round(1).to_string(index=False))
+
+
+def calibrate(repeat=5):
+    """Temps (médiane) d'une charge fixe numpy/pandas/JSON, indépendante du code du dashboard
+    
+    Le rapport entre la calibration courante et celle de la référence
+    corrige les temps enregistrés sur une autre machine.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'year': rng.integers(2002, 2026, CALIBRATION_ROWS),
+                       'montant': rng.random(CALIBRATION_ROWS)})
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        totals = df.groupby('year')['montant'].agg(['sum', 'mean', 'max'])
+        np.sort(df['montant'].to_numpy())
+        json.dumps(df['montant'].head(CALIBRATION_ROWS // 10).tolist())
+        totals.to_numpy().sum()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings), 4)
+
+
+def compare(results, baseline, scale=1.0):
+    """Liste des régressions par rapport à la référence enregistrée
+    
+    Les temps de la référence sont multipliés par `scale` (rapport des
+    calibrations de la machine courante et de celle de la référence).
+    """
+    regressions = []
+    for key, current in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        for metric in ('cold_s', 'warm_s'):
+            expected = reference[metric] * scale
+            if (current[metric] > expected * (1 + TIME_TOLERANCE)
+                    and current[metric] - expected > TIME_NOISE_FLOOR_S):
+                regressions.append(f"{key} {metric}: {expected:.4f} (référence ajustée) -> {current[metric]}")
+        if current['peak_mb'] > reference['peak_mb'] * (1 + MEMORY_TOLERANCE) + 1:
+            regressions.append(f"{key} peak_mb: {reference['peak_mb']} -> {current['peak_mb']}")
+        if current['payload_bytes'] > reference['payload_bytes'] * (1 + PAYLOAD_TOLERANCE):
+            regressions.append(
+                f"{key} payload_bytes: {reference['payload_bytes']} -> {current['payload_bytes']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless des vues du dashboard")
+    parser.add_argument('--rows-per-year', default=','.join(map(str, DEFAULT_ROWS_PER_YEAR)),
+                        help="tailles des jeux synthétiques (lignes programme par année)")
+    parser.add_argument('--repeat', type=int, default=3, help="répétitions par mesure (médiane)")
+    parser.add_argument('--only', action='append', help="ne mesurer que les cibles contenant ce texte")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="fichier de référence JSON")
+    parser.add_argument('--save-baseline', action='store_true', help="enregistrer les mesures comme référence")
+    parser.add_argument('--compare', action='store_true', help="comparer à la référence (code 1 si régression)")
+    parser.add_argument('--startup', action='store_true',
+                        help="profil d'import au démarrage et contrôle du budget de démarrage à froid")
+    parser.add_argument('--schema', action='store_true',
+                        help="mémoire du jeu au grain programme avec et sans types compacts")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        return 0 if report_startup() else 1
+
+    # Les temps à froid mesurent le calcul : le cache disque persistant est désactivé
+    os.environ.pop('BUDGET_DISK_CACHE_DIR', None)
+    rows_per_year_list = [int(n) for n in args.rows_per_year.split(',')]
+    if args.schema:
+        report_schema(rows_per_year_list)
+        return 0
+    calibration = calibrate()
+    print(f"Calibration de la machine : {calibration} s")
+    results = run_benchmarks(rows_per_year_list, args.repeat, args.only)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'streamlit': st.__version__,
+                    'pandas': pd.__version__,
+                    'calibration_s': calibration,
+                },
+                'results': results,
+            }, f, indent=2, ensure_ascii=False, sort_keys=True)
+        print(f"Référence enregistrée : {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        reference_calibration = baseline['meta'].get('calibration_s')
+        if reference_calibration:
+            scale = calibration / reference_calibration
+            print(f"Temps de référence ajustés × {scale:.2f} (calibration de la référence : "
+                  f"{reference_calibration} s)")
+        else:
+            scale = 1.0
+            print("Référence sans calibration : temps comparés tels quels (--save-baseline pour la régénérer)")
+        regressions = compare(results, baseline['results'], scale)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            return 1
+        print("Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# export.py
+"""Export statique du dashboard
+
+Toutes les figures de chaque vue, dans leur état initial, sont rendues pour
+la version courante des données dans des processus parallèles :
+
+    export/<version>/<vue>/<figure>.json   spécification Plotly
+    export/<version>/<vue>/<figure>.html   page autonome (plotly.min.js partagé)
+    export/<version>/<vue>/<figure>.png    image, avec --png (nécessite kaleido)
+    export/<version>/index.html            sommaire par vue
+    export/<version>/manifest.json         version, date, fichiers et tailles
+    export/latest -> <version>
+
+La consultation peut être servie directement depuis ces fichiers ; la
+session Streamlit reste réservée à l'exploration interactive.
+
+    python export.py                      # export/<version>/
+    python export.py --workers 4 --png
+    python export.py --force              # réécrit une version déjà exportée
+"""
+import argparse
+import html
+import json
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import Dashboard
+
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export')
+
+# Dashboard du processus de rendu, créé une fois par worker
+_dashboard = None
+
+
+def slugify(text):
+    """Nom de fichier ASCII pour un nom de vue ou de figure"""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode()
+    return re.sub(r'[^0-9A-Za-z]+', '_', text).strip('_').lower()
+
+
+def _init_worker(version):
+    global _dashboard
+    _dashboard = Dashboard.BudgetDashboard()
+    if _dashboard.data_version != version:
+        raise RuntimeError(f"Les données ont changé pendant l'export ({version} -> {_dashboard.data_version})")
+
+
+def _render(view, name, directory, png):
+    """Rend une figure dans `directory` ; retourne {format: (fichier, octets)}"""
+    import plotly.io as pio
+
+    builder, params = _dashboard.snapshot_figures()[view][name]
+    fig = builder(**params)
+    stem = os.path.join(directory, slugify(name))
+
+    files = {}
+    with open(stem + '.json', 'w', encoding='utf-8') as f:
+        f.write(fig.to_json())
+    files['json'] = stem + '.json'
+
+    fig.write_html(stem + '.html', include_plotlyjs='../plotly.min.js', full_html=True)
+    files['html'] = stem + '.html'
+
+    if png:
+        pio.write_image(fig, stem + '.png', width=Dashboard.CHART_WIDTH_PX, height=600)
+        files['png'] = stem + '.png'
+    return {fmt: (path, os.path.getsize(path)) for fmt, path in files.items()}
+
+
+def _write_index(directory, version, figures):
+    """Sommaire HTML : une section par vue, chaque figure intégrée dans un iframe"""
+    sections = []
+    for view, entries in figures.items():
+        items = "\n".join(
+            f'<iframe src="{html.escape(entry["files"]["html"])}" loading="lazy" '
+            f'title="{html.escape(name)}"></iframe>'
+            for name, entry in entries.items()
+        )
+        sections.append(f"<h2>{html.escape(view)}</h2>\n<div class=\"grid\">\n{items}\n</div>")
+
+    with open(os.path.join(directory, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="fr">
+<head>
+<meta charset="utf-8">
+<title>Dashboard Budget Français - version {version}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2rem; }}
+h1 {{ color: #1f77b4; }}
+.grid {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(600px, 1fr)); gap: 1rem; }}
+iframe {{ width: 100%; height: 520px; border: 1px solid #ddd; }}
+</style>
+</head>
+<body>
+<h1>🇫🇷 Dashboard Budget Français &amp; Analyse LOLF</h1>
+<p>Instantané statique de la version {version} des données.</p>
+{chr(10).join(sections)}
+</body>
+</html>
+""")
+
+
+def _update_latest(output, version):
+    """Fait pointer export/latest vers la version exportée (remplacement atomique du lien)"""
+    link = os.path.join(output, 'latest')
+    tmp = link + '.tmp'
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    os.symlink(version, tmp)
+    os.replace(tmp, link)
+
+
+def export(output=EXPORT_DIR, workers=None, png=False, force=False):
+    """Exporte toutes les vues de la version courante ; retourne le répertoire de l'export"""
+    if png:
+        # kaleido est le moteur de rendu local de Plotly pour les images statiques
+        try:
+            import kaleido  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("L'export PNG nécessite kaleido : pip install kaleido") from exc
+
+    dashboard = Dashboard.BudgetDashboard()
+    version = dashboard.data_version
+    target = os.path.join(output, version)
+    if os.path.exists(target) and not force:
+        print(f"Version {version} déjà exportée : {target} (--force pour réécrire)")
+        return target
+
+    # Rendu dans un répertoire temporaire, publié d'un coup une fois complet
+    staging = os.path.join(output, f".{version}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    import plotly.offline
+    os.makedirs(staging)
+    with open(os.path.join(staging, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+        f.write(plotly.offline.get_plotlyjs())
+
+    jobs = []
+    for view, entries in dashboard.snapshot_figures().items():
+        directory = os.path.join(staging, slugify(view))
+        os.makedirs(directory)
+        jobs += [(view, name, directory) for name in entries]
+
+    start = time.perf_counter()
+    figures = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version,)) as pool:
+        futures = [(view, name, pool.submit(_render, view, name, directory, png))
+                   for view, name, directory in jobs]
+        for view, name, future in futures:
+            files = future.result()
+            figures.setdefault(view, {})[name] = {
+                'files': {fmt: os.path.relpath(path, staging) for fmt, (path, _) in files.items()},
+                'bytes': {fmt: size for fmt, (_, size) in files.items()},
+            }
+            print(f"{view} / {name}: " + "  ".join(f"{fmt}={size}" for fmt, (_, size) in files.items()),
+                  flush=True)
+
+    _write_index(staging, version, figures)
+    with open(os.path.join(staging, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': version,
+            'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'figures': figures,
+        }, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    _update_latest(output, version)
+    print(f"{len(jobs)} figures exportées en {time.perf_counter() - start:.1f} s : {target}")
+    return target
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export statique des vues du dashboard")
+    parser.add_argument('--output', default=EXPORT_DIR, help="répertoire racine des exports")
+    parser.add_argument('--workers', type=int, default=None, help="processus de rendu (défaut : nombre de CPU)")
+    parser.add_argument('--png', action='store_true', help="exporter aussi des images PNG (kaleido)")
+    parser.add_argument('--force', action='store_true', help="réécrire une version déjà exportée")
+    args = parser.parse_args(argv)
+
+    export(args.output, args.workers, args.png, args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
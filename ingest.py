@@ -0,0 +1,370 @@
+# ingest.py
+"""Ingestion des jeux de données budgétaires ouverts (PLF, PLR, exécution)
+
+Les fichiers d'un catalogue sont téléchargés en parallèle (asyncio, nombre
+de transferts borné, connexions HTTP persistantes réutilisées), écrits sur
+disque par blocs, validés puis convertis au format colonnaire dans un
+répertoire directement utilisable comme BUDGET_DATA_PATH :
+
+    data/<nom>.parquet          jeu converti (lu par le dashboard)
+    data/.raw/<nom>.<ext>       fichier source tel que téléchargé
+    data/.ingest_manifest.json  ETag, Last-Modified, sha256 et taille par fichier
+
+Un rafraîchissement ne transfère que ce qui a changé : requêtes
+conditionnelles (If-None-Match / If-Modified-Since), puis comparaison du
+sha256 ; un fichier identique n'est pas réécrit, sa version reste donc la
+même pour le dashboard.
+
+Catalogue JSON :
+
+    {"defaults": {"sep": ";", "decimal": ","},
+     "datasets": [{"name": "plf-2025", "url": "https://.../exports/csv",
+                   "columns": {"Exercice": "year", "Mission": "mission", "CP": "dépenses"}}]}
+
+    python ingest.py --catalog catalogue.json --dest data
+    python ingest.py --catalog catalogue.json --dest data --mirror /srv/miroir   # hors ligne
+    python ingest.py http://localhost:8000/2024.csv http://localhost:8000/2025.csv --dest data
+"""
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+
+import Dashboard
+
+CHUNK_BYTES = 1024 * 1024
+DEFAULT_CONCURRENCY = 8
+HTTP_TIMEOUT_S = 60
+MAX_REDIRECTS = 5
+MANIFEST_NAME = '.ingest_manifest.json'
+RAW_DIR = '.raw'
+
+# Années plausibles d'un jeu budgétaire
+YEAR_RANGE = (1950, 2100)
+
+
+class IngestError(Exception):
+    """Fichier rejeté : téléchargement, lecture ou validation en échec"""
+
+
+class ConnectionPool:
+    """Connexions HTTP(S) persistantes, réutilisées d'un téléchargement à l'autre par hôte"""
+
+    def __init__(self, timeout=HTTP_TIMEOUT_S):
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme, netloc):
+        """Connexion inactive de l'hôte, ou nouvelle connexion ; retourne (connexion, réutilisée)"""
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop(), True
+        return self.connect(scheme, netloc), False
+
+    def connect(self, scheme, netloc):
+        connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        return connection_class(netloc, timeout=self.timeout)
+
+    def release(self, scheme, netloc, connection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def close(self):
+        with self._lock:
+            for connections in self._idle.values():
+                for connection in connections:
+                    connection.close()
+            self._idle.clear()
+
+
+def _stream_to_file(read, path):
+    """Copie par blocs ; retourne (sha256, taille)"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as f:
+        while chunk := read(CHUNK_BYTES):
+            digest.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+# Erreurs d'une connexion persistante que le serveur a fermée pendant son inactivité
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+def _send(pool, parts, target, headers):
+    """Envoie la requête GET ; retourne (connexion, réponse)
+
+    Une connexion réutilisée que le serveur a fermée entre-temps est
+    abandonnée, et la requête renvoyée une fois sur une connexion neuve.
+    """
+    connection, reused = pool.acquire(parts.scheme, parts.netloc)
+    try:
+        connection.request('GET', target, headers=headers)
+        return connection, connection.getresponse()
+    except STALE_CONNECTION_ERRORS:
+        connection.close()
+        if not reused:
+            raise
+    except BaseException:
+        connection.close()
+        raise
+
+    connection = pool.connect(parts.scheme, parts.netloc)
+    try:
+        connection.request('GET', target, headers=headers)
+        return connection, connection.getresponse()
+    except BaseException:
+        connection.close()
+        raise
+
+
+def fetch_http(pool, url, path, previous):
+    """Télécharge `url` vers `path` si elle a changé depuis `previous` (entrée du manifeste)
+
+    Retourne None si le serveur répond 304, sinon les métadonnées du transfert.
+    """
+    conditional = previous is not None and previous.get('url') == url
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+        headers = {'Accept-Encoding': 'identity', 'User-Agent': 'Dashboard_LOLF-ingest'}
+        if conditional:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+
+        connection, response = _send(pool, parts, target, headers)
+        # La connexion retourne au pool une fois la réponse lue en entier (y compris
+        # sur 304 ou une erreur HTTP) ; un transfert interrompu la ferme
+        reusable = False
+        try:
+            if response.status != 200:
+                response.read()
+                reusable = True
+            if response.status in (301, 302, 303, 307, 308):
+                location = response.getheader('Location')
+                if not location:
+                    raise IngestError(f"{url} : HTTP {response.status} sans en-tête Location")
+                url = urljoin(url, location)
+            elif response.status == 304:
+                return None
+            elif response.status != 200:
+                raise IngestError(f"{url} : HTTP {response.status} {response.reason}")
+            else:
+                sha256, size = _stream_to_file(response.read, path)
+                reusable = True
+                return {
+                    'etag': response.getheader('ETag'),
+                    'last_modified': response.getheader('Last-Modified'),
+                    'sha256': sha256,
+                    'size': size,
+                }
+        finally:
+            if reusable:
+                pool.release(parts.scheme, parts.netloc, connection)
+            else:
+                connection.close()
+    raise IngestError(f"{url} : trop de redirections")
+
+
+def fetch_local(source_path, path, previous):
+    """Copie par blocs d'un fichier local (miroir), ignorée si taille et date sont inchangées"""
+    stat = os.stat(source_path)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    if previous and previous.get('size') == stat.st_size and previous.get('last_modified') == last_modified:
+        return None
+    with open(source_path, 'rb') as f:
+        sha256, size = _stream_to_file(f.read, path)
+    return {'etag': None, 'last_modified': last_modified, 'sha256': sha256, 'size': size}
+
+
+def read_raw(path, options):
+    """Lit un fichier téléchargé selon les options du catalogue (séparateur, décimale, encodage)"""
+    if os.path.splitext(path)[1].lower() in ('.csv', '.txt', ''):
+        df = pd.read_csv(path, sep=options.get('sep', ','), decimal=options.get('decimal', '.'),
+                         encoding=options.get('encoding', 'utf-8'))
+    else:
+        df = Dashboard.source_from_path(path).read()
+    return df.rename(columns=options.get('columns', {}))
+
+
+def validate_budget_frame(df, name):
+    """Contrôle et normalise un jeu ingéré : année entière plausible, au moins une colonne numérique
+
+    Seules l'année, les niveaux LOLF présents et les colonnes numériques sont conservés.
+    """
+    if 'year' not in df.columns:
+        raise IngestError(f"{name} : colonne 'year' absente (colonnes : {', '.join(map(str, df.columns))})")
+    if df.columns.duplicated().any():
+        raise IngestError(f"{name} : colonnes en double après renommage")
+
+    years = pd.to_numeric(df['year'], errors='coerce')
+    if years.isna().any() or (years % 1 != 0).any():
+        raise IngestError(f"{name} : années manquantes ou non entières")
+    if not years.between(*YEAR_RANGE).all():
+        raise IngestError(f"{name} : années hors de l'intervalle {YEAR_RANGE}")
+
+    levels = [c for c in Dashboard.LOLF_LEVELS if c in df.columns]
+    values = [c for c in df.columns
+              if c != 'year' and c not in levels and pd.api.types.is_numeric_dtype(df[c])]
+    if not values:
+        raise IngestError(f"{name} : aucune colonne numérique")
+    return df[levels + values].assign(year=years.astype('int64'))[['year', *levels, *values]]
+
+
+def ingest_one(pool, entry, dest, previous, mirror=None):
+    """Télécharge, valide et convertit une entrée du catalogue ; retourne (statut, entrée du manifeste)
+
+    Statuts : 'not-modified' (rien transféré), 'unchanged' (contenu identique),
+    'updated' (jeu converti réécrit).
+    """
+    name, url = entry['name'], entry['url']
+    extension = os.path.splitext(urlsplit(url).path)[1].lower() or '.csv'
+    raw_path = os.path.join(dest, RAW_DIR, name + extension)
+    tmp_path = os.path.join(dest, RAW_DIR, f".{name}.part{extension}")
+    output = os.path.join(dest, name + '.parquet')
+
+    if mirror is not None:
+        source_path = os.path.join(mirror, os.path.basename(urlsplit(url).path))
+    elif urlsplit(url).scheme in ('http', 'https'):
+        source_path = None
+    else:
+        source_path = urlsplit(url).path if url.startswith('file://') else url
+
+    try:
+        if source_path is None:
+            result = fetch_http(pool, url, tmp_path, previous)
+        else:
+            result = fetch_local(source_path, tmp_path, previous)
+        if result is None and os.path.exists(output):
+            return 'not-modified', previous
+        if result is None:
+            # Converti absent (supprimé, premier passage interrompu) : nouveau transfert complet
+            return ingest_one(pool, entry, dest, None, mirror)
+
+        record = dict(result, url=url, fetched_at=time.strftime('%Y-%m-%dT%H:%M:%S%z'))
+        if previous and previous.get('sha256') == result['sha256'] and os.path.exists(output):
+            os.remove(tmp_path)
+            return 'unchanged', record
+
+        df = validate_budget_frame(read_raw(tmp_path, entry), name)
+        os.replace(tmp_path, raw_path)
+        converted_tmp = os.path.join(dest, f".{name}.parquet")
+        Dashboard.write_columnar(df, converted_tmp)
+        os.replace(converted_tmp, output)
+        return 'updated', dict(record, rows=len(df))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_manifest(dest):
+    path = os.path.join(dest, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(dest, manifest):
+    path = os.path.join(dest, MANIFEST_NAME)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+
+async def ingest(entries, dest, concurrency=DEFAULT_CONCURRENCY, mirror=None):
+    """Ingestion concurrente du catalogue ; retourne {nom: statut ou exception}"""
+    os.makedirs(os.path.join(dest, RAW_DIR), exist_ok=True)
+    manifest = load_manifest(dest)
+    pool = ConnectionPool()
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='ingest') as executor:
+        async def run(entry):
+            async with semaphore:
+                return await loop.run_in_executor(
+                    executor, ingest_one, pool, entry, dest, manifest.get(entry['name']), mirror
+                )
+
+        outcomes = await asyncio.gather(*(run(entry) for entry in entries), return_exceptions=True)
+    pool.close()
+
+    results = {}
+    for entry, outcome in zip(entries, outcomes):
+        if isinstance(outcome, BaseException):
+            results[entry['name']] = outcome
+        else:
+            status, record = outcome
+            manifest[entry['name']] = record
+            results[entry['name']] = status
+    save_manifest(dest, manifest)
+    return results
+
+
+def load_catalog(path):
+    """Entrées du catalogue JSON, options par défaut appliquées"""
+    with open(path, encoding='utf-8') as f:
+        catalog = json.load(f)
+    defaults = catalog.get('defaults', {})
+    return [dict(defaults, **entry) for entry in catalog['datasets']]
+
+
+def entries_from_urls(urls):
+    return [{'name': os.path.splitext(os.path.basename(urlsplit(url).path))[0], 'url': url} for url in urls]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingestion des données budgétaires ouvertes")
+    parser.add_argument('urls', nargs='*', help="URL ou chemins de fichiers à ingérer")
+    parser.add_argument('--catalog', help="catalogue JSON des jeux à ingérer")
+    parser.add_argument('--dest', default='data', help="répertoire des jeux convertis (BUDGET_DATA_PATH)")
+    parser.add_argument('--mirror', help="répertoire miroir local utilisé à la place du réseau")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help="transferts simultanés")
+    args = parser.parse_args(argv)
+
+    entries = (load_catalog(args.catalog) if args.catalog else []) + entries_from_urls(args.urls)
+    if not entries:
+        parser.error("aucun jeu à ingérer (--catalog ou URL)")
+    names = [entry['name'] for entry in entries]
+    if len(set(names)) != len(names):
+        parser.error("noms de jeux en double dans le catalogue")
+
+    start = time.perf_counter()
+    results = asyncio.run(ingest(entries, args.dest, args.concurrency, args.mirror))
+    failures = 0
+    for name, status in results.items():
+        if isinstance(status, BaseException):
+            failures += 1
+            print(f"ÉCHEC {name} : {status}")
+        else:
+            print(f"{status:<13} {name}")
+    counts = {status: sum(1 for s in results.values() if s == status)
+              for status in ('updated', 'unchanged', 'not-modified')}
+    print(f"{len(results)} jeux en {time.perf_counter() - start:.1f} s : "
+          f"{counts['updated']} mis à jour, {counts['unchanged']} identiques, "
+          f"{counts['not-modified']} non modifiés, {failures} en échec")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# ledger.py
+"""Agrégation en flux des grands livres d'exécution (exports ligne à ligne)
+
+Un export d'exécution compte des millions de lignes par année ; le charger
+d'un bloc dans un DataFrame ferait dépendre la mémoire de la taille du
+fichier. Les fichiers sont ici lus par blocs (générateurs sur les blocs CSV
+ou les lots Arrow/Parquet), chaque bloc est agrégé au grain que le dashboard
+affiche (année × mission × programme) puis libéré : la mémoire de pointe ne
+dépend que de la taille d'un bloc et du nombre de programmes.
+
+Plusieurs fichiers (un par année, typiquement) sont agrégés en parallèle
+dans un pool de processus, puis fusionnés. Le résultat s'utilise comme
+BUDGET_LEAVES_PATH (arborescence LOLF) ou comme BUDGET_DATA_PATH.
+
+    python ledger.py exports/execution-*.csv --output data/execution.parquet --sep ";" --decimal ","
+    python ledger.py exports/*.parquet --output data/execution.parquet --workers 4 \\
+        --rename Exercice=year --rename Mission=mission --rename Programme=programme --rename CP=dépenses
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import Dashboard
+
+# Grain d'agrégation : celui des graphiques et de l'arborescence LOLF
+LEDGER_GRAIN = ('year', 'mission', 'programme')
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+def iter_ledger_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, columns=None, rename=None,
+                       sep=',', decimal='.', encoding='utf-8'):
+    """Blocs successifs d'un grand livre (DataFrame d'au plus `chunk_rows` lignes)
+
+    `rename` associe les noms de colonnes du fichier aux noms du dashboard ;
+    `columns` (noms du dashboard) limite la lecture aux colonnes utiles.
+    """
+    rename = rename or {}
+    source_names = {target: source for source, target in rename.items()}
+    wanted = None if columns is None else {source_names.get(c, c) for c in columns}
+
+    extension = os.path.splitext(path)[1].lower()
+    source_class = Dashboard.SOURCE_FORMATS.get(extension)
+    if source_class is Dashboard.CsvSource or extension in ('.txt', '.gz'):
+        reader = pd.read_csv(path, sep=sep, decimal=decimal, encoding=encoding, chunksize=chunk_rows,
+                             usecols=None if wanted is None else (lambda c: c in wanted))
+        with reader:
+            for chunk in reader:
+                yield chunk.rename(columns=rename)
+    elif source_class is Dashboard.ParquetSource:
+        Dashboard._require_pyarrow()
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path, memory_map=True)
+        selected = None if wanted is None else [c for c in parquet.schema_arrow.names if c in wanted]
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=selected):
+            yield batch.to_pandas().rename(columns=rename)
+    elif source_class is Dashboard.ArrowSource:
+        pa = Dashboard._require_pyarrow()
+
+        reader = pa.ipc.open_file(pa.memory_map(path, 'r'))
+        selected = None if wanted is None else [c for c in reader.schema.names if c in wanted]
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if selected is not None:
+                batch = batch.select(selected)
+            # Les lots d'un fichier IPC peuvent dépasser la taille de bloc demandée
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows).to_pandas().rename(columns=rename)
+    else:
+        raise ValueError(f"Format de grand livre non supporté : {path}")
+
+
+class LedgerAggregator:
+    """Agrégat incrémental au grain `grain` : sommes des montants, première valeur des stocks
+
+    Les agrégats partiels des blocs sont accumulés puis recompactés dès
+    qu'ils dépassent `compact_rows` lignes : la mémoire reste bornée par le
+    nombre de groupes, quel que soit le nombre de lignes lues.
+    """
+
+    def __init__(self, grain=LEDGER_GRAIN, values=None, compact_rows=DEFAULT_CHUNK_ROWS):
+        self.grain = list(grain)
+        self.values = None if values is None else list(values)
+        self.compact_rows = compact_rows
+        self.rows = 0
+        self._partials = []
+        self._pending_rows = 0
+
+    def _aggregations(self):
+        return {c: 'first' if c in Dashboard.NON_ADDITIVE_COLUMNS else 'sum' for c in self.values}
+
+    def _group(self, frame):
+        # dropna=False : une ligne sans programme reste comptée dans sa mission
+        return frame.groupby(self.grain, sort=False, observed=True, dropna=False).agg(self._aggregations())
+
+    def add(self, chunk):
+        missing = [c for c in self.grain if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Colonnes de grain absentes du grand livre : {', '.join(missing)}")
+        if self.values is None:
+            self.values = [c for c in chunk.columns
+                           if c not in self.grain and pd.api.types.is_numeric_dtype(chunk[c])]
+        self.rows += len(chunk)
+        partial = self._group(chunk[self.grain + self.values])
+        self._partials.append(partial)
+        self._pending_rows += len(partial)
+        if self._pending_rows > self.compact_rows:
+            self._compact()
+        return self
+
+    def merge(self, frame, rows):
+        """Ajoute l'agrégat d'un autre fichier et le nombre de lignes dont il est issu"""
+        if self.values is None:
+            self.values = [c for c in frame.columns if c not in self.grain]
+        self.rows += rows
+        self._partials.append(frame.set_index(self.grain)[self.values])
+        self._pending_rows += len(frame)
+        if self._pending_rows > self.compact_rows:
+            self._compact()
+        return self
+
+    def _compact(self):
+        if len(self._partials) > 1:
+            self._partials = [self._group(pd.concat(self._partials).reset_index())]
+        self._pending_rows = sum(len(p) for p in self._partials)
+
+    def result(self):
+        """Agrégat final, trié par année, mission et programme"""
+        if not self._partials:
+            return pd.DataFrame(columns=self.grain + (self.values or []))
+        self._compact()
+        return self._partials[0].sort_index().reset_index()
+
+
+def aggregate_chunks(chunks, grain=LEDGER_GRAIN, values=None, compact_rows=DEFAULT_CHUNK_ROWS):
+    """Agrège un itérable de blocs ; retourne (agrégat, lignes lues)"""
+    aggregator = LedgerAggregator(grain, values, compact_rows)
+    for chunk in chunks:
+        aggregator.add(chunk)
+    return aggregator.result(), aggregator.rows
+
+
+def aggregate_ledger(path, grain=LEDGER_GRAIN, values=None, chunk_rows=DEFAULT_CHUNK_ROWS, **read_options):
+    """Agrège un fichier de grand livre bloc par bloc ; retourne (agrégat, lignes lues)"""
+    columns = None if values is None else [*grain, *values]
+    chunks = iter_ledger_chunks(path, chunk_rows, columns, **read_options)
+    return aggregate_chunks(chunks, grain, values, chunk_rows)
+
+
+def aggregate_ledgers(paths, workers=None, grain=LEDGER_GRAIN, values=None,
+                      chunk_rows=DEFAULT_CHUNK_ROWS, **read_options):
+    """Agrège plusieurs fichiers en parallèle (un processus par fichier) puis fusionne
+
+    Retourne (agrégat, lignes lues). Une année répartie sur plusieurs
+    fichiers est correctement fusionnée.
+    """
+    aggregator = LedgerAggregator(grain, values, chunk_rows)
+    if workers == 1 or len(paths) == 1:
+        results = (aggregate_ledger(path, grain, values, chunk_rows, **read_options) for path in paths)
+        for frame, rows in results:
+            aggregator.merge(frame, rows)
+        return aggregator.result(), aggregator.rows
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(aggregate_ledger, path, grain, values, chunk_rows, **read_options)
+                   for path in paths]
+        for future in futures:
+            aggregator.merge(*future.result())
+    return aggregator.result(), aggregator.rows
+
+
+def peak_memory_mb():
+    """Mémoire résidente de pointe du processus et de ses workers (Mo, Linux)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrégation en flux de grands livres d'exécution")
+    parser.add_argument('paths', nargs='+', help="fichiers de grand livre (CSV, Parquet, Arrow IPC)")
+    parser.add_argument('--output', required=True, help="fichier agrégé (.parquet ou .arrow)")
+    parser.add_argument('--workers', type=int, default=None, help="processus (défaut : nombre de CPU)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help="lignes par bloc")
+    parser.add_argument('--values', nargs='+', default=None,
+                        help="colonnes de montants (défaut : toutes les colonnes numériques)")
+    parser.add_argument('--rename', action='append', default=[], metavar='SOURCE=CIBLE',
+                        help="renommage d'une colonne du fichier (répétable)")
+    parser.add_argument('--sep', default=',', help="séparateur CSV")
+    parser.add_argument('--decimal', default='.', help="séparateur décimal CSV")
+    parser.add_argument('--encoding', default='utf-8', help="encodage CSV")
+    args = parser.parse_args(argv)
+
+    try:
+        rename = dict(item.split('=', 1) for item in args.rename)
+    except ValueError:
+        parser.error("--rename attend SOURCE=CIBLE")
+
+    start = time.perf_counter()
+    frame, rows = aggregate_ledgers(args.paths, args.workers, values=args.values, chunk_rows=args.chunk_rows,
+                                    rename=rename, sep=args.sep, decimal=args.decimal, encoding=args.encoding)
+    # Année int16, mission et programme encodés par dictionnaire dans le fichier
+    Dashboard.write_columnar(Dashboard.apply_budget_schema(frame), args.output)
+    own, children = peak_memory_mb()
+    print(f"{rows:,} lignes -> {len(frame):,} agrégats ({frame['year'].nunique()} années) "
+          f"en {time.perf_counter() - start:.1f} s : {args.output}")
+    print(f"Mémoire de pointe : {own:.0f} Mo (principal), {children:.0f} Mo (workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# prewarm.py
+"""Préchauffage du cache disque pour toutes les combinaisons de contrôles
+
+L'espace des paramètres du dashboard est petit et énumérable (curseurs de
+période, indicateurs, horizon et nombre de trajectoires des scénarios,
+solde primaire du balayage r − g...). Chaque combinaison est calculée dans
+un pool de processus et enregistrée dans le cache disque
+(BUDGET_DISK_CACHE_DIR) : figures, percentiles des scénarios et tables
+d'agrégats. En production, toute interaction est alors une lecture de cache.
+
+Les entrées déjà présentes pour la version courante des données ne sont pas
+recalculées. Avec --watch (ou quand un worker du serveur a déjà appliqué le
+rafraîchissement), les figures qui ne dépendent pas des colonnes révisées
+sont reportées sur la nouvelle version : seules les autres sont recalculées.
+
+    python prewarm.py --cache-dir /var/cache/dashboard_lolf
+    python prewarm.py --workers 4 --only scenario_debt --only scenario_deficit
+    python prewarm.py --watch 60          # recommence après chaque rafraîchissement des données
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Dashboard
+
+# Dashboard du processus de calcul et builders de ses figures, créés une fois par worker
+_dashboard = None
+_builders = None
+
+
+def _init_worker(version):
+    global _dashboard, _builders
+    _dashboard = Dashboard.BudgetDashboard()
+    if _dashboard.data_version != version:
+        raise RuntimeError(f"Les données ont changé pendant le préchauffage ({version} -> {_dashboard.data_version})")
+    _builders = {name: builder for name, (builder, _) in _dashboard.figure_parameter_space().items()}
+
+
+def _warm(batch):
+    """Calcule un lot de figures partageant les mêmes paramètres ; retourne [(nom, secondes)]
+
+    Les figures d'un même lot (dette et déficit d'un scénario) réutilisent
+    les mêmes résultats intermédiaires dans le processus.
+    """
+    timings = []
+    for name, params in batch:
+        start = time.perf_counter()
+        _dashboard.figure_spec(name, _builders[name], **params)
+        timings.append((name, time.perf_counter() - start))
+    return timings
+
+
+def pending_batches(dashboard, disk, names=None):
+    """Lots de figures absentes du cache pour la version courante ; retourne (lots, combinaisons)"""
+    batches = {}
+    total = 0
+    for name, (_, combos) in dashboard.figure_parameter_space().items():
+        if names and name not in names:
+            continue
+        for params in combos:
+            total += 1
+            key = tuple(sorted(params.items()))
+            if not disk.contains('figure', name, key, dashboard.data_version):
+                batches.setdefault(key, []).append((name, params))
+    # Les lots les plus coûteux (scénarios à nombreuses trajectoires) partent en premier
+    ordered = sorted(batches.values(), key=lambda batch: -dict(batch[0][1]).get('n_paths', 0))
+    return ordered, total
+
+
+def prewarm(dashboard, workers=None, names=None):
+    """Calcule les combinaisons manquantes de la version courante ; retourne {nom: (figures, secondes, max)}"""
+    disk = Dashboard.get_disk_cache()
+    version = dashboard.data_version
+    batches, total = pending_batches(dashboard, disk, names)
+    pending = sum(len(batch) for batch in batches)
+    print(f"Version {version} : {total} combinaisons, {total - pending} déjà en cache, {pending} à calculer",
+          flush=True)
+    if not batches:
+        return {}
+
+    start = time.perf_counter()
+    timings = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(version,)) as pool:
+        for batch in pool.map(_warm, batches):
+            for name, elapsed in batch:
+                count, seconds, slowest = timings.get(name, (0, 0.0, 0.0))
+                timings[name] = (count + 1, seconds + elapsed, max(slowest, elapsed))
+
+    for name, (count, seconds, slowest) in sorted(timings.items()):
+        print(f"{name:<20} {count:>6} figures {seconds:>8.1f} s cumulées (max {slowest:.2f} s)")
+    stats = disk.stats()
+    print(f"{pending} figures calculées en {time.perf_counter() - start:.1f} s ; cache disque : "
+          f"{stats['entries']} entrées, {stats['bytes'] / 1024 / 1024:.1f}/{stats['max_bytes'] / 1024 / 1024:.0f} Mo")
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Préchauffage du cache disque du dashboard")
+    parser.add_argument('--cache-dir', default=os.environ.get('BUDGET_DISK_CACHE_DIR'),
+                        help="répertoire du cache disque (défaut : BUDGET_DISK_CACHE_DIR)")
+    parser.add_argument('--workers', type=int, default=None, help="processus de calcul (défaut : nombre de CPU)")
+    parser.add_argument('--only', action='append', help="ne préchauffer que cette figure (répétable)")
+    parser.add_argument('--watch', type=float, default=None, metavar='SECONDES',
+                        help="vérifier la source à cet intervalle et préchauffer chaque nouvelle version")
+    args = parser.parse_args(argv)
+
+    if not args.cache_dir:
+        parser.error("cache disque non configuré (--cache-dir ou BUDGET_DISK_CACHE_DIR)")
+    # Transmis aux workers, qui écrivent directement dans le cache
+    os.environ['BUDGET_DISK_CACHE_DIR'] = args.cache_dir
+
+    version = None
+    while True:
+        # Le store du processus applique les rafraîchissements et reporte les figures non affectées
+        dashboard = Dashboard.BudgetDashboard()
+        if dashboard.data_version != version:
+            prewarm(dashboard, args.workers, args.only)
+            version = dashboard.data_version
+        if args.watch is None:
+            return 0
+        time.sleep(args.watch)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,375 @@
+# serve.py
+"""Déploiement multi-processus du dashboard
+
+Un processus Streamlit sérialise le rendu de toutes les sessions sous un
+même GIL. Ce module lance N workers `streamlit run Dashboard.py` derrière
+un reverse proxy TCP local :
+
+- le jeu de données est préparé une fois (agrégation, taux simulés,
+  indicateurs) puis publié au format Arrow IPC non compressé dans la mémoire
+  partagée (/dev/shm) ; chaque worker le lit en mémoire mappée via
+  BUDGET_DATA_PATH et le sert tel quel, sans refaire la préparation : les
+  pages sont partagées par le noyau et tous les workers voient la même
+  version des données ;
+- le proxy surveille la source et republie le jeu à chaque changement : les
+  workers lisent un lien stable vers le fichier de la version courante et
+  appliquent la nouvelle version à leur prochain rerun ;
+- avec BUDGET_METRICS_PORT, chaque worker expose /metrics sur son propre
+  port (BUDGET_METRICS_PORT + i) ;
+- le proxy route chaque client vers un worker fixe (hachage de l'adresse IP) :
+  l'état d'une session Streamlit vit dans un seul processus ;
+- `--rerun-scaling` mesure le débit de rerun de sessions AppTest (sans
+  serveur ni navigateur) réparties sur 1 à N processus : il estime ce que
+  rapporte un processus de plus, mais ne traverse ni le proxy ni les workers
+  Streamlit.
+
+    python serve.py --workers 4 --port 8501
+    python serve.py --rerun-scaling --workers 4 --sessions 16
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import Dashboard
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dashboard.py')
+
+SHARED_MEMORY_DIR = '/dev/shm'
+PROXY_BUFFER_BYTES = 64 * 1024
+WORKER_STARTUP_TIMEOUT_S = 60
+DEFAULT_WATCH_INTERVAL_S = 5.0
+
+VIEWS = ["Vue d'ensemble", "Analyse LOLF", "Analyse sectorielle", "Comparaisons", "Projections"]
+
+
+class SharedDatasetPublisher:
+    """Jeu préparé publié en mémoire partagée, republié à chaque changement de la source
+
+    Chaque version est écrite dans son propre fichier
+    (dashboard_lolf-<version>.arrow) : un redémarrage réutilise le même
+    fichier, donc la même version pour les caches et les exports. Les
+    workers lisent `path`, un lien remplacé atomiquement à chaque
+    publication ; leur store voit l'empreinte du lien changer et applique la
+    nouvelle version, en conservant les figures non affectées.
+    """
+
+    def __init__(self, source=None, directory=None, name='dashboard_lolf-current', keep=2):
+        if directory is None:
+            directory = SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{name}.arrow")
+        self.keep = keep
+        self.store = Dashboard.BudgetStore(source or Dashboard.default_source())
+        self._published = []
+        self._created = set()
+        self._stop = threading.Event()
+
+    def publish(self):
+        """Écrit le fichier de la version courante s'il n'existe pas et y fait pointer le lien"""
+        dataset = self.store.dataset
+        name = f"dashboard_lolf-{dataset.version}.arrow"
+        target = os.path.join(self.directory, name)
+        if not os.path.exists(target):
+            tmp = os.path.join(self.directory, f".{os.getpid()}.{name}")
+            Dashboard.write_prepared_dataset(dataset, tmp)
+            os.replace(tmp, target)
+            self._created.add(target)
+        link = os.path.join(self.directory, f".{os.getpid()}.{os.path.basename(self.path)}")
+        os.symlink(name, link)
+        os.replace(link, self.path)
+
+        # Les fichiers des versions remplacées sont supprimés ; un worker qui
+        # les a encore en mémoire mappée garde ses pages jusqu'à sa relecture
+        if target in self._published:
+            self._published.remove(target)
+        self._published.append(target)
+        while len(self._published) > self.keep:
+            old = self._published.pop(0)
+            self._created.discard(old)
+            if os.path.exists(old):
+                os.remove(old)
+        return self.path
+
+    def refresh(self):
+        """Republie si la source a changé ; retourne le BudgetChange, ou None"""
+        change = self.store.refresh()
+        if change is not None:
+            self.publish()
+            print(f"Données republiées : version {self.store.dataset.version}", flush=True)
+        return change
+
+    def watch(self, interval):
+        """Vérifie la source toutes les `interval` secondes dans un thread dédié"""
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as exc:
+                    print(f"Rafraîchissement des données impossible : {exc}", file=sys.stderr, flush=True)
+
+        threading.Thread(target=poll, name='budget-publisher', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def unpublish(self):
+        """Arrête la surveillance, supprime le lien et les fichiers que cette publication a écrits
+
+        Un fichier de version qui existait déjà (publié par une autre
+        instance) est laissé en place.
+        """
+        self.stop()
+        if os.path.islink(self.path):
+            os.remove(self.path)
+        for path in self._created:
+            if os.path.exists(path):
+                os.remove(path)
+        self._created.clear()
+        self._published.clear()
+
+
+def publish_shared_dataset(source=None, directory=None):
+    """Prépare le jeu de données et le publie une fois en mémoire partagée ; retourne son chemin"""
+    return SharedDatasetPublisher(source, directory).publish()
+
+
+def backend_for(host, n_workers):
+    """Worker attribué à une adresse client (stable d'une connexion à l'autre)"""
+    digest = hashlib.blake2b(host.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % n_workers
+
+
+async def _pipe(reader, writer):
+    try:
+        while data := await reader.read(PROXY_BUFFER_BYTES):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_proxy(host, port, backend_ports):
+    """Reverse proxy TCP à affinité de session : HTTP et WebSocket passent tels quels
+
+    Si le worker attribué ne répond pas, la connexion bascule sur le suivant.
+    """
+    async def handle(client_reader, client_writer):
+        peer = client_writer.get_extra_info('peername')
+        first = backend_for(peer[0] if peer else '', len(backend_ports))
+        for offset in range(len(backend_ports)):
+            backend_port = backend_ports[(first + offset) % len(backend_ports)]
+            try:
+                backend_reader, backend_writer = await asyncio.open_connection('127.0.0.1', backend_port)
+                break
+            except OSError:
+                continue
+        else:
+            client_writer.close()
+            return
+        await asyncio.gather(_pipe(client_reader, backend_writer), _pipe(backend_reader, client_writer))
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def start_workers(n_workers, base_port, data_path):
+    """Lance N processus Streamlit sur 127.0.0.1:base_port+i, tous sur le même fichier partagé
+
+    BUDGET_METRICS_PORT, s'il est défini, est le port /metrics du premier
+    worker : le worker i reçoit BUDGET_METRICS_PORT + i.
+    """
+    metrics_port = os.environ.get('BUDGET_METRICS_PORT')
+    workers = []
+    for i in range(n_workers):
+        port = base_port + i
+        env = dict(os.environ, BUDGET_DATA_PATH=data_path)
+        if metrics_port:
+            env['BUDGET_METRICS_PORT'] = str(int(metrics_port) + i)
+        workers.append((port, subprocess.Popen(
+            [sys.executable, '-m', 'streamlit', 'run', APP_PATH,
+             '--server.port', str(port), '--server.address', '127.0.0.1',
+             '--server.headless', 'true', '--browser.gatherUsageStats', 'false'],
+            env=env
+        )))
+    return workers
+
+
+def wait_for_workers(workers, timeout=WORKER_STARTUP_TIMEOUT_S):
+    """Attend que chaque worker réponde sur son endpoint de santé"""
+    from urllib.request import urlopen
+    deadline = time.monotonic() + timeout
+    for port, process in workers:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"Le worker du port {port} s'est arrêté (code {process.returncode})")
+            try:
+                with urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Le worker du port {port} ne répond pas")
+                time.sleep(0.2)
+
+
+def serve(n_workers, host='0.0.0.0', port=8501, base_port=None, watch_interval=DEFAULT_WATCH_INTERVAL_S):
+    """Publie les données, lance les workers et sert le proxy jusqu'à interruption
+
+    La source est vérifiée toutes les `watch_interval` secondes (0 : jamais)
+    et republiée quand elle change.
+    """
+    publisher = SharedDatasetPublisher(name=f"dashboard_lolf-{port}")
+    data_path = publisher.publish()
+    if watch_interval > 0:
+        publisher.watch(watch_interval)
+    base_port = base_port or port + 1
+    workers = start_workers(n_workers, base_port, data_path)
+    try:
+        wait_for_workers(workers)
+        print(f"{n_workers} workers prêts (ports {base_port}-{base_port + n_workers - 1}), "
+              f"données partagées : {data_path} ({os.path.getsize(data_path) / 1024 / 1024:.1f} Mo)")
+        print(f"Dashboard : http://{host}:{port}", flush=True)
+        asyncio.run(run_proxy(host, port, [p for p, _ in workers]))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        publisher.stop()
+        for _, process in workers:
+            process.send_signal(signal.SIGTERM)
+        for _, process in workers:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+_compile_lock = threading.Lock()
+
+
+def _session_loop(reruns):
+    """Une session AppTest : un rerun par vue, en boucle ; retourne les latences (s)"""
+    from streamlit.testing.v1 import AppTest
+    # Le premier run compile le script : la compilation concurrente n'est pas
+    # sûre sous CPython 3.11, les runs mesurés restent concurrents
+    with _compile_lock:
+        at = AppTest.from_file(APP_PATH, default_timeout=600)
+        at.run()
+    latencies = []
+    for i in range(reruns):
+        at.sidebar.selectbox[0].select(VIEWS[i % len(VIEWS)])
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+        if at.exception:
+            raise RuntimeError(at.exception[0].value)
+    return latencies
+
+
+def _worker_sessions(n_sessions, reruns):
+    """Sessions concurrentes (threads) au sein d'un même processus, comme dans un worker Streamlit"""
+    results = [None] * n_sessions
+
+    def run(i):
+        results[i] = _session_loop(reruns)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n_sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if any(result is None for result in results):
+        raise RuntimeError("Une session du test de charge a échoué")
+    return [latency for result in results for latency in result]
+
+
+def rerun_scaling(n_sessions, worker_counts, reruns=10, data_path=None):
+    """Débit de rerun de `n_sessions` sessions AppTest réparties sur 1..N processus
+
+    Les sessions exécutent le script dans les processus d'un pool, sans
+    serveur Streamlit, WebSocket ni proxy : la mesure isole le coût du rendu
+    et l'effet du GIL partagé, pas celui du déploiement servi par `serve`.
+    Retourne [(processus, reruns/s, latence p50, latence p95)]. Avec un seul
+    processus, toutes les sessions se partagent le GIL ; l'accélération
+    estime ce que rapporte chaque processus supplémentaire.
+
+    Sans `data_path`, le jeu est publié pour la durée de la mesure puis
+    supprimé ; BUDGET_DATA_PATH retrouve sa valeur précédente.
+    """
+    publisher = None
+    if data_path is None:
+        publisher = SharedDatasetPublisher(name=f"dashboard_lolf-rerun-{os.getpid()}")
+        data_path = publisher.publish()
+    previous_path = os.environ.get('BUDGET_DATA_PATH')
+    os.environ['BUDGET_DATA_PATH'] = data_path
+    try:
+        results = []
+        for n_workers in worker_counts:
+            per_worker = [n_sessions // n_workers + (i < n_sessions % n_workers) for i in range(n_workers)]
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                # Préchauffage des imports et des caches propres à chaque processus
+                list(pool.map(_worker_sessions, [1] * n_workers, [1] * n_workers))
+                start = time.perf_counter()
+                latencies = [latency
+                             for batch in pool.map(_worker_sessions, per_worker, [reruns] * n_workers)
+                             for latency in batch]
+                elapsed = time.perf_counter() - start
+            quantiles = statistics.quantiles(latencies, n=20)
+            results.append((n_workers, len(latencies) / elapsed, quantiles[9], quantiles[18]))
+        return results
+    finally:
+        if previous_path is None:
+            os.environ.pop('BUDGET_DATA_PATH', None)
+        else:
+            os.environ['BUDGET_DATA_PATH'] = previous_path
+        if publisher is not None:
+            publisher.unpublish()
+
+
+def report_rerun_scaling(results, n_sessions):
+    print(f"{n_sessions} sessions AppTest concurrentes (hors proxy et workers), {os.cpu_count()} CPU")
+    print(f"{'processus':>9} {'reruns/s':>10} {'p50 (s)':>8} {'p95 (s)':>8} {'accélération':>13}")
+    reference = results[0][1]
+    for n_workers, throughput, p50, p95 in results:
+        print(f"{n_workers:>9} {throughput:>10.1f} {p50:>8.3f} {p95:>8.3f} {throughput / reference:>12.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard multi-processus derrière un proxy à affinité")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processus Streamlit")
+    parser.add_argument('--host', default='0.0.0.0', help="adresse d'écoute du proxy")
+    parser.add_argument('--port', type=int, default=8501, help="port du proxy")
+    parser.add_argument('--base-port', type=int, default=None, help="premier port des workers (défaut : port+1)")
+    parser.add_argument('--watch', type=float, default=DEFAULT_WATCH_INTERVAL_S, metavar='SECONDES',
+                        help="intervalle de vérification de la source à republier (0 : jamais)")
+    parser.add_argument('--rerun-scaling', action='store_true',
+                        help="mesurer le débit de rerun de sessions AppTest de 1 à N processus (sans proxy)")
+    parser.add_argument('--sessions', type=int, default=None, help="sessions concurrentes de la mesure")
+    parser.add_argument('--reruns', type=int, default=10, help="reruns par session de la mesure")
+    args = parser.parse_args(argv)
+
+    if args.rerun_scaling:
+        n_sessions = args.sessions or 4 * args.workers
+        worker_counts = sorted({1, *(n for n in (2, 4, 8, 16) if n < args.workers), args.workers})
+        report_rerun_scaling(rerun_scaling(n_sessions, worker_counts, args.reruns), n_sessions)
+        return 0
+
+    serve(args.workers, args.host, args.port, args.base_port, args.watch)
+    return 0
+
+
+if __name__ == "__main__":
+    # AppTest remplace __main__ dans les processus de la mesure : les fonctions
+    # transmises au pool doivent être référencées par le module `serve`
+    import serve
+    sys.exit(serve.main())
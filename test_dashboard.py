@@ -0,0 +1,192 @@
+# test_dashboard.py
+"""Tests des calculs du dashboard (python -m pytest)"""
+import sys
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pytest
+
+import Dashboard
+
+
+@pytest.fixture(scope='module')
+def historical():
+    return Dashboard.InlineSource(Dashboard.BUDGET_DATA).read().set_index('year')
+
+
+@pytest.fixture(scope='module')
+def dashboard():
+    return Dashboard.BudgetDashboard()
+
+
+def test_debt_dynamics_reproduces_historical_debt(historical):
+    """Avec le solde total (intérêts compris) et r = 0, la dynamique suit la dette observée
+
+    En 2024-2025, la variation de la dette est exactement l'opposé du solde.
+    """
+    years = [2023, 2024, 2025]
+    frame = historical.loc[years]
+    ratio = frame['dette'] / frame['pib'] * 100
+    balance = (frame['déficit'] / frame['pib'] * 100).to_numpy()[1:]
+    growth = (frame['pib'] / frame['pib'].shift()).to_numpy()[1:] - 1
+
+    path = Dashboard.debt_dynamics(ratio.iloc[0], balance, 0.0, growth)
+    np.testing.assert_allclose(path, ratio.to_numpy()[1:], rtol=1e-9)
+
+
+def test_debt_dynamics_levels_match_ratios():
+    """La forme en ratio (effet r − g) équivaut à la forme en niveaux divisée par le PIB"""
+    rate, growth, balance = 0.03, 0.02, np.array([10.0, -5.0, 20.0])
+    pib = 1000 * (1 + growth) ** np.arange(1, 4)
+    levels = Dashboard.debt_dynamics(800.0, balance, rate)
+    ratios = Dashboard.debt_dynamics(80.0, balance / pib * 100, rate, growth)
+    np.testing.assert_allclose(ratios, levels / pib * 100)
+
+
+def test_projection_continues_historical_debt(dashboard):
+    """La dette projetée prolonge la dette 2025 du seul solde projeté (intérêts non recomptés)"""
+    forecast_df, _ = dashboard.projection_frames()
+    last = dashboard.dataset.row(2025)
+    debt = float(last['dette']) - forecast_df['déficit'].cumsum()
+    np.testing.assert_allclose(forecast_df['dette_pib_%'], debt / forecast_df['pib'] * 100, rtol=1e-5)
+
+
+def test_aggregate_to_year_sums_in_float64():
+    """Des lignes float32 sont sommées en float64 : le schéma compact ne s'applique qu'au total"""
+    detail = pd.DataFrame({'year': np.repeat(np.int16(2024), 1000),
+                           'dépenses': np.full(1000, 0.1, dtype=np.float32)})
+    total = Dashboard.aggregate_to_year(detail)
+    assert total['dépenses'].dtype == np.float64
+    assert total['dépenses'].iloc[0] == pytest.approx(1000 * float(np.float32(0.1)), rel=1e-12)
+
+
+def test_downsample_keeps_extremes_across_gaps():
+    """Une série lacunaire garde ses extrêmes et ses trous après sous-échantillonnage"""
+    x = np.arange(20_000, dtype=np.float64)
+    y = np.sin(x / 500)
+    y[3_000:3_500] = np.nan
+    y[12_000:12_010] = np.nan
+    y[0] = np.nan
+    y[7_777], y[15_555] = 5.0, -5.0
+
+    x_out, y_out = Dashboard.downsample(x, y, 500)
+    finite = ~np.isnan(y_out)
+    assert finite.sum() <= 500 + 2
+    assert np.nanmax(y_out) == 5.0 and np.nanmin(y_out) == -5.0
+    # Un point NaN par trou, à sa position : la courbe reste interrompue
+    np.testing.assert_array_equal(x_out[~finite], [0, 3_000, 12_000])
+    assert np.all(np.diff(x_out) > 0)
+
+
+def test_downsample_all_missing():
+    x_out, y_out = Dashboard.downsample(np.arange(100), np.full(100, np.nan), 10)
+    assert len(x_out) == 1 and np.isnan(y_out[0])
+
+
+def test_figure_cache_keeps_figure_objects():
+    """Une figure en mémoire est reprise sans reconstruction, et sa place est comptée"""
+    cache = Dashboard.FigureCache(max_bytes=10_000_000)
+    key = ('evolution', (), 'v1')
+    fig = go.Figure(go.Scatter(x=[1, 2], y=[3, 4]))
+    cache.put(key, fig.to_json(), fig)
+    assert cache.figure(key) is fig
+    assert cache.size == (1 + Dashboard.FIGURE_OBJECT_FACTOR) * sys.getsizeof(fig.to_json())
+
+    cache.rekey('v1', 'v2', lambda name, params: True)
+    assert cache.figure(key) is None and cache.figure(key[:2] + ('v2',)) is fig
+    cache.clear()
+    assert cache.size == 0 and cache.figure(key[:2] + ('v2',)) is None
+
+
+def test_range_stats_matches_pandas(historical):
+    """Requêtes sur intervalle identiques aux agrégats pandas, trous et bornes hors série compris"""
+    series = historical['déficit'].copy()
+    series.loc[[2008, 2009]] = np.nan
+    stats = Dashboard.RangeStats(series.index.to_numpy(), series.to_numpy())
+    for start, end in [(2002, 2025), (2005, 2012), (2008, 2009), (2010, 2010), (1990, 2004)]:
+        window = series.loc[max(start, 2002):end]
+        if window.isna().all():
+            assert np.isnan(stats.mean(start, end)) and np.isnan(stats.max(start, end))
+            continue
+        assert stats.mean(start, end) == pytest.approx(window.mean())
+        assert stats.min(start, end) == window.min()
+        assert stats.max(start, end) == window.max()
+    assert np.isnan(stats.mean(2030, 2035))
+
+
+def test_aggregate_cube_periods(historical):
+    frame = historical.reset_index()
+    cube = Dashboard.AggregateCube(frame, (2006, 2040), columns=['recettes'])
+    assert cube.periods == [(2002, 2005), (2006, 2025)]
+    assert cube.period(2006) == (2006, 2025) and cube.label((2002, 2005)) == '2002-2005'
+    before = frame.loc[frame['year'] < 2006, 'recettes']
+    assert cube.stat('recettes', (2002, 2005)) == pytest.approx(before.mean())
+    assert cube.stat('recettes', (2002, 2005), 'sum') == pytest.approx(before.sum())
+    assert cube.stat('recettes', (2006, 2025), 'count') == 20
+
+
+def test_aggregate_cube_keeps_empty_periods(historical):
+    """Une rupture dans un trou de la série donne une période vide (NaN, effectif 0)"""
+    frame = historical.reset_index()
+    frame = frame[(frame['year'] < 2010) | (frame['year'] > 2012)]
+    cube = Dashboard.AggregateCube(frame, (2010, 2012), columns=['recettes'])
+    assert cube.periods == [(2002, 2009), (2010, 2011), (2012, 2025)]
+    assert np.isnan(cube.stat('recettes', (2010, 2011)))
+    assert cube.stat('recettes', (2010, 2011), 'count') == 0
+
+
+def _write_years(directory, frame):
+    for year, row in frame.groupby('year'):
+        row.to_parquet(directory / f"{year}.parquet", index=False)
+
+
+def test_incremental_refresh_matches_full_rebuild(tmp_path):
+    """Années révisées et ajoutées : le jeu rafraîchi est celui d'une lecture complète"""
+    pytest.importorskip('pyarrow')
+    frame = Dashboard.InlineSource(Dashboard.BUDGET_DATA).read()
+    _write_years(tmp_path, frame[frame['year'] < 2025])
+    store = Dashboard.BudgetStore(Dashboard.source_from_path(str(tmp_path)))
+    assert store.refresh() is None
+
+    revised = frame.copy()
+    revised.loc[revised['year'] == 2024, 'recettes'] += 10
+    _write_years(tmp_path, revised[revised['year'] >= 2024])
+    change = store.refresh()
+    assert change == Dashboard.BudgetChange((2025,), (2024,), ('recettes',), False)
+
+    rebuilt = Dashboard.BudgetStore(Dashboard.source_from_path(str(tmp_path)))
+    assert store.dataset.version == rebuilt.dataset.version
+    refreshed, expected = store.dataset.view(), rebuilt.dataset.view()
+    assert list(refreshed['year']) == list(range(2002, 2026))
+    pd.testing.assert_frame_equal(refreshed[expected.columns], expected, check_dtype=False, rtol=1e-6)
+
+
+def test_disk_cache_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    cache = Dashboard.DiskCache(str(tmp_path), max_bytes=10_000_000)
+    table = pd.DataFrame({'year': [2024, 2025], 'recettes': [300.5, 310.25]})
+    values = {
+        'figure': '{"data": [], "layout": {}}',
+        'table': table,
+        'tables': {'a': table, 'b': table.assign(recettes=0.0)},
+    }
+    for kind, value in values.items():
+        cache.put(kind, 'nom', (('indicator', 'recettes'),), 'v1', value)
+
+    assert cache.get('figure', 'nom', (('indicator', 'recettes'),), 'v1') == values['figure']
+    pd.testing.assert_frame_equal(cache.get('table', 'nom', (('indicator', 'recettes'),), 'v1'), table)
+    tables = cache.get('tables', 'nom', (('indicator', 'recettes'),), 'v1')
+    assert set(tables) == {'a', 'b'}
+    pd.testing.assert_frame_equal(tables['b'], values['tables']['b'])
+    # Autre version des données : absente
+    assert cache.get('figure', 'nom', (('indicator', 'recettes'),), 'v2') is None
+
+
+def test_benchmark_compare_scales_reference_times():
+    """Une référence mesurée sur une machine plus rapide n'est pas une régression"""
+    benchmark = pytest.importorskip('benchmark')
+    reference = {'cold_s': 0.2, 'warm_s': 0.12, 'peak_mb': 3.0, 'payload_bytes': 1000}
+    current = dict(reference, warm_s=0.3)
+    assert benchmark.compare({'v': current}, {'v': reference})
+    assert not benchmark.compare({'v': current}, {'v': reference}, scale=2.5)
@@ -0,0 +1,60 @@
+# test_ingest.py
+"""Tests des téléchargements HTTP de l'ingestion (python -m pytest)"""
+import http.server
+import threading
+
+import pytest
+
+import ingest
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/sans-location':
+            self.send_response(302)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = b'year;recettes\n2025;300\n'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Connexion persistante annoncée, puis fermée par le serveur après la réponse
+        self.close_connection = self.path == '/ferme'
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_stale_pooled_connection_is_retried(server, tmp_path):
+    """Une connexion du pool fermée par le serveur est remplacée, sans erreur"""
+    pool = ingest.ConnectionPool(timeout=5)
+    try:
+        first = ingest.fetch_http(pool, f"{server}/ferme", tmp_path / 'a.csv', None)
+        second = ingest.fetch_http(pool, f"{server}/ferme", tmp_path / 'b.csv', None)
+    finally:
+        pool.close()
+    assert first['sha256'] == second['sha256']
+    assert (tmp_path / 'b.csv').read_bytes().startswith(b'year;recettes')
+
+
+def test_redirect_without_location(server, tmp_path):
+    pool = ingest.ConnectionPool(timeout=5)
+    try:
+        with pytest.raises(ingest.IngestError, match='Location'):
+            ingest.fetch_http(pool, f"{server}/sans-location", tmp_path / 'a.csv', None)
+    finally:
+        pool.close()